@@ -1,24 +1,32 @@
+import asyncio
+import atexit
+import gc
+import hashlib
 import os
+import queue
+import secrets
 import time
 import uuid
 from contextlib import asynccontextmanager
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+from starlette.datastructures import Headers, MutableHeaders, QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import anyio.to_thread
 from fastapi import FastAPI
-from fastapi.responses import JSONResponse
 from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 import logging
+from logging.handlers import QueueHandler, QueueListener
 
 from routers.auth_router import auth_router
 from routers.sec_router import sec_router
 from routers.stock_router import stock_router
 from routers.forecast_router import forecast_router
-from routers.admin_router import admin_router
+from routers.admin_router import ADMIN_API_KEY, admin_router
 from routers.prefetch_router import prefetch_router
 from routers.news_router import news_router
-from routers.alerts_router import alerts_router
+from routers.alerts_router import alerts_router, ensure_alert_indexes
 from routers.signal_router import signal_router
 from routers.users_router import users_router
 from routers.notification_router import notification_router
@@ -27,79 +35,258 @@ from services.event_bus import get_event_bus_status, start_event_bus, stop_event
 from services.notifications_service import register_notification_event_handlers
 from services.ops_events_service import register_ops_event_handlers
 from services.stock_service import ensure_indexes
-from database.database import client as mongo_client
-from utils.limiter import limiter
+from database.database import async_client as mongo_client, client as sync_mongo_client
+from utils.limiter import TokenBucketMiddleware, limiter
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
-from slowapi.middleware import SlowAPIMiddleware
 
-logging.basicConfig(level=logging.INFO)
+# Root logging goes through a queue: request handlers only enqueue records and a
+# listener thread does the blocking stderr writes. force=True replaces the plain
+# handler scheduler.py installs at import time (its format is kept here).
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s"))
+_log_queue_handler = QueueHandler(_log_queue)
+_log_queue_handler.setFormatter(logging.Formatter("%(message)s"))
+logging.basicConfig(level=logging.INFO, handlers=[_log_queue_handler], force=True)
+_log_listener = QueueListener(_log_queue, _log_stream_handler, respect_handler_level=True)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 logger = logging.getLogger(__name__)
 ENABLE_SCHEDULER = os.getenv("ENABLE_SCHEDULER", "false").strip().lower() == "true"
+ENABLE_PROFILING = os.getenv("ENABLE_PROFILING", "false").strip().lower() == "true"
+
+try:
+    ANYIO_THREAD_TOKENS = max(1, int(os.getenv("ANYIO_THREAD_TOKENS", "100").strip() or "100"))
+except ValueError:
+    ANYIO_THREAD_TOKENS = 100
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against a response ETag."""
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class ResponseHeadersMiddleware:
+    """
+    One pass over each outgoing response start message:
+      - security headers on every HTTP response
+      - no-cache for stock and SEC data unless the router set Cache-Control
+      - strong ETag on stock and SEC GET 200s, answering 304 Not Modified
+        when the client's If-None-Match still matches
+    """
+
+    DATA_PATH_PREFIXES = ("/stocks/", "/transactions/")
+    NO_CACHE_SKIP_METHODS = frozenset({"HEAD", "OPTIONS"})
+
+    # Content-Security-Policy is complex and might break things (e.g. inline scripts/styles),
+    # so proceeding cautiously without strict CSP for now unless requested.
+    SECURITY_HEADERS = (
+        (b"x-content-type-options", b"nosniff"),
+        (b"x-frame-options", b"DENY"),
+        (b"x-xss-protection", b"1; mode=block"),
+        (b"strict-transport-security", b"max-age=31536000; includeSubDomains"),
+        (b"referrer-policy", b"same-origin"),
+        (b"permissions-policy", b"geolocation=(), microphone=(), camera=()"),
+        (b"cross-origin-resource-policy", b"same-site"),
+    )
+    NO_CACHE_HEADERS = (
+        (b"cache-control", b"no-store, no-cache, must-revalidate"),
+        (b"pragma", b"no-cache"),
+    )
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
+        method = scope["method"]
+        is_data = method not in self.NO_CACHE_SKIP_METHODS and scope.get("path", "").startswith(
+            self.DATA_PATH_PREFIXES
+        )
+        use_etag = is_data and method == "GET"
+        if_none_match = Headers(scope=scope).get("if-none-match") if use_etag else None
+        start_message: Message | None = None
+        body_parts: list[bytes] = []
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                # ASGI header names are already lowercase bytes, so compare directly.
+                raw = message["headers"] = [*message.get("headers", ()), *self.SECURITY_HEADERS]
+                if use_etag and message["status"] == 200:
+                    # Hold the start message until the full body is known.
+                    start_message = message
+                    return
+                if is_data and not any(name == b"cache-control" for name, _ in raw):
+                    raw.extend(self.NO_CACHE_HEADERS)
+                await send(message)
+                return
+            if start_message is None or message["type"] != "http.response.body":
+                await send(message)
+                return
 
-class NoCacheDataMiddleware(BaseHTTPMiddleware):
-    """Set Cache-Control so stock and SEC data are not cached by browsers or proxies."""
+            body_parts.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
 
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-        path = request.scope.get("path", "")
-        # Only force no-cache if the router hasn't already set a Cache-Control header
-        if (path.startswith("/stocks/") or path.startswith("/transactions/")) and "cache-control" not in response.headers:
-            response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate"
-            response.headers["Pragma"] = "no-cache"
-        return response
+            body = b"".join(body_parts)
+            etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+            headers = MutableHeaders(scope=start_message)
+            headers["ETag"] = etag
+            if "cache-control" not in headers:
+                headers["Cache-Control"] = "private, max-age=0, must-revalidate"
 
+            if if_none_match and _etag_matches(if_none_match, etag):
+                start_message["status"] = 304
+                del headers["content-length"]
+                del headers["content-type"]
+                body = b""
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """Add security headers to all responses."""
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
 
-    async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
-        response.headers["Referrer-Policy"] = "same-origin"
-        response.headers["Permissions-Policy"] = "geolocation=(), microphone=(), camera=()"
-        response.headers["Cross-Origin-Resource-Policy"] = "same-site"
-        # Content-Security-Policy is complex and might break things (e.g. inline scripts/styles), 
-        # so proceeding cautiously without strict CSP for now unless requested.
-        return response
+        await self.app(scope, receive, send_wrapper)
 
 
-class RequestIdMiddleware(BaseHTTPMiddleware):
+class RequestIdMiddleware:
     """Attach a request ID to each response and emit a concise access log."""
 
-    async def dispatch(self, request: Request, call_next):
-        request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
-        request.state.request_id = request_id
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get("x-request-id") or uuid.uuid4().hex
+        scope.setdefault("state", {})["request_id"] = request_id
         start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+            await send(message)
 
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send_wrapper)
         except Exception:
-            logger.exception("Unhandled error rid=%s path=%s", request_id, request.url.path)
+            logger.exception("Unhandled error rid=%s path=%s", request_id, scope["path"])
             raise
 
         elapsed_ms = int((time.perf_counter() - start) * 1000)
-        response.headers["X-Request-ID"] = request_id
         logger.info(
             "rid=%s method=%s path=%s status=%s duration_ms=%s",
             request_id,
-            request.method,
-            request.url.path,
-            response.status_code,
+            scope["method"],
+            scope["path"],
+            status_code,
             elapsed_ms,
         )
-        return response
+
+
+class HealthShortcutMiddleware:
+    """
+    Answer GET /health with a prebuilt 200 before any other middleware runs, so
+    liveness probes stay cheap and responsive even when the app is saturated.
+    """
+
+    _START = {
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", b"15")],
+    }
+    _BODY = {"type": "http.response.body", "body": b'{"status":"ok"}'}
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"] == "/health" and scope["method"] == "GET":
+            await send(self._START)
+            await send(self._BODY)
+            return
+        await self.app(scope, receive, send)
+
+
+class ProfilingMiddleware:
+    """
+    On-demand pyinstrument profiling (only installed with ENABLE_PROFILING=true).
+    A request with ?profile=1 runs normally but gets the profiler's HTML report
+    instead of its response. When ADMIN_API_KEY is configured the request must
+    also carry it in X-API-Key. A new Profiler per request keeps concurrent
+    profiles from interfering with each other.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    def _wants_profile(self, scope: Scope) -> bool:
+        query_string = scope.get("query_string", b"")
+        if b"profile=" not in query_string:
+            return False
+        if QueryParams(query_string).get("profile", "").lower() in ("", "0", "false"):
+            return False
+        if not ADMIN_API_KEY:
+            return True
+        api_key = Headers(scope=scope).get("x-api-key", "")
+        return secrets.compare_digest(api_key, ADMIN_API_KEY)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        from pyinstrument import Profiler
+
+        async def discard(_message: Message) -> None:
+            return None
+
+        profiler = Profiler(async_mode="enabled")
+        profiler.start()
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            profiler.stop()
+        await HTMLResponse(profiler.output_html())(scope, receive, send)
+
+
+async def _warm_mongo_pools() -> None:
+    """Open connections on both clients so the first request skips TLS + auth."""
+    results = await asyncio.gather(
+        mongo_client.admin.command("ping"),
+        run_in_threadpool(sync_mongo_client.admin.command, "ping"),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning("MongoDB pool warm-up failed: %s", result)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Starts the scheduler on startup and shuts it down on shutdown."""
     logger.info("Starting application...")
-    ensure_indexes()
+    # Sync endpoints and run_in_threadpool share AnyIO's default limiter (40 slots)
+    anyio.to_thread.current_default_thread_limiter().total_tokens = ANYIO_THREAD_TOKENS
+    await ensure_indexes()
+    try:
+        await run_in_threadpool(ensure_alert_indexes)
+    except Exception as exc:
+        logger.warning("Alert index creation failed: %s", exc)
+    await _warm_mongo_pools()
     register_notification_event_handlers()
     register_ops_event_handlers()
     start_event_bus()
@@ -109,44 +296,71 @@ async def lifespan(app: FastAPI):
         logger.info("In-process scheduler enabled")
     else:
         logger.info("In-process scheduler disabled (set ENABLE_SCHEDULER=true to enable)")
+    # Move long-lived startup objects (modules, routes, models) out of the
+    # collector's generations so later collections only walk request garbage.
+    gc.collect()
+    gc.freeze()
     logger.info("Application started successfully")
     yield
     logger.info("Shutting down application...")
     if ENABLE_SCHEDULER:
         shutdown_scheduler()
     stop_event_bus()
+    await mongo_client.close()
     logger.info("Application shut down successfully")
 
 
+# Keep the default JSONResponse: for routes with a response_model, FastAPI
+# (>=0.130) serializes straight to bytes in pydantic-core. A custom default
+# response class such as ORJSONResponse would bypass that path.
 app = FastAPI(lifespan=lifespan)
 
 # Rate Limiting
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-app.add_middleware(SlowAPIMiddleware)
 
-# Security Headers
 app.add_middleware(RequestIdMiddleware)
-app.add_middleware(SecurityHeadersMiddleware)
 
-# GZip: compress JSON responses > 500 bytes (huge win for mobile over WiFi)
-app.add_middleware(GZipMiddleware, minimum_size=500)
-app.add_middleware(NoCacheDataMiddleware)
-_allowed_origins = [
+# Per-IP token bucket; inside ResponseHeadersMiddleware (and CORS) so its 429s
+# carry the security headers and browsers can read them, outside the routers
+app.add_middleware(TokenBucketMiddleware)
+
+# Security headers, data no-cache and ETag/304 in one layer; added before GZip so
+# the ETag hash covers the uncompressed bytes
+app.add_middleware(ResponseHeadersMiddleware)
+
+# GZip: compress JSON responses > 1000 bytes at level 1 (most of the size win for
+# large stock/SEC payloads at a fraction of the level-9 CPU cost)
+app.add_middleware(GZipMiddleware, minimum_size=1000, compresslevel=1)
+
+# Explicit origins only (no "*", which browsers reject alongside credentials).
+# A frozenset makes the per-request origin check in CORSMiddleware a set lookup;
+# FRONTEND_URL is normalised because browsers never send a trailing slash.
+_ALLOWED_ORIGINS = frozenset(filter(None, [
     "http://localhost:3000",
     "http://localhost:5173",
-]
-_frontend_url = os.getenv("FRONTEND_URL", "")
-if _frontend_url:
-    _allowed_origins.append(_frontend_url)
+    os.getenv("FRONTEND_URL", "").strip().rstrip("/"),
+]))
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=_allowed_origins,
+    allow_origins=_ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
+
+# Outermost so a profile covers the whole middleware stack
+if ENABLE_PROFILING:
+    try:
+        import pyinstrument  # noqa: F401
+    except ImportError:
+        logger.warning("ENABLE_PROFILING is set but pyinstrument is not installed; profiling disabled")
+    else:
+        app.add_middleware(ProfilingMiddleware)
+
+# Outermost of all: liveness probes skip the rest of the stack
+app.add_middleware(HealthShortcutMiddleware)
 app.include_router(auth_router, prefix="/auth", tags=["Authentication"])
 app.include_router(sec_router, tags=["SecEdgar"])
 app.include_router(stock_router, tags=["Stocks"])
@@ -167,7 +381,7 @@ async def welcome():
 
 @app.get("/health")
 async def health():
-    """Liveness check for load balancers."""
+    """Liveness check for load balancers (served by HealthShortcutMiddleware; kept for OpenAPI)."""
     return {"status": "ok"}
 
 
@@ -175,7 +389,7 @@ async def health():
 async def readiness():
     """Readiness check including MongoDB connectivity."""
     try:
-        await run_in_threadpool(mongo_client.admin.command, "ping")
+        await mongo_client.admin.command("ping")
     except Exception as exc:
         logger.exception("Readiness check failed")
         return JSONResponse(status_code=503, content={"status": "degraded", "reason": str(exc)})
@@ -4,13 +4,16 @@ MongoDB connection module — production-tuned for M0 free tier.
 Optimizations applied:
   1. Connection pooling: maxPoolSize=10 (M0 limit is 500, but 10 is optimal for single-server)
   2. Timeouts: 5s connect, 10s server selection, 10s socket — fail fast instead of hanging
-  3. Compression: zlib wire compression reduces bytes over the network (Atlas M0 supports it)
+  3. Compression: zstd/snappy wire compression (zlib level 1 as fallback) reduces bytes
+     over the network at far lower CPU cost than zlib level 6
   4. Read preference: secondaryPreferred — read from secondaries when available (replicas)
   5. Write concern: w=1 (default, confirmed write to primary only — fast for M0)
   6. retryWrites: already in URI, but connection is configured for resilience
+  7. Async client: async handlers await the async_* handles instead of blocking
+     the event loop; sync handles remain for services, scripts and scheduler jobs
 """
 
-from pymongo import MongoClient, ReadPreference
+from pymongo import AsyncMongoClient, MongoClient, ReadPreference
 import os
 from pathlib import Path
 
@@ -23,8 +26,7 @@ DATABASE_URL = os.getenv("MONGODB_URI") or os.getenv("MONGO_URI")
 if not DATABASE_URL:
     raise RuntimeError("Missing MongoDB connection string. Set MONGODB_URI or MONGO_URI.")
 
-client = MongoClient(
-    DATABASE_URL,
+_CLIENT_OPTIONS = dict(
     # ─── Connection pool ───
     maxPoolSize=10,
     minPoolSize=2,
@@ -33,11 +35,14 @@ client = MongoClient(
     connectTimeoutMS=5_000,
     serverSelectionTimeoutMS=10_000,
     socketTimeoutMS=10_000,
-    # ─── Wire compression (reduces bytes over network) ───
-    compressors="zlib",
-    zlibCompressionLevel=6,
+    # ─── Wire compression (server picks the first codec it supports) ───
+    compressors="zstd,snappy,zlib",
+    zlibCompressionLevel=1,
 )
 
+client = MongoClient(DATABASE_URL, **_CLIENT_OPTIONS)
+async_client = AsyncMongoClient(DATABASE_URL, **_CLIENT_OPTIONS)
+
 DATABASE_SEC = "sec_data"
 DATABASE_STOCK = "stock_data"
 DATABASE_USER = "users"
@@ -45,3 +50,7 @@ DATABASE_USER = "users"
 sec_db = client[DATABASE_SEC]
 stock_db = client[DATABASE_STOCK]
 user_db = client[DATABASE_USER]
+
+async_sec_db = async_client[DATABASE_SEC]
+async_stock_db = async_client[DATABASE_STOCK]
+async_user_db = async_client[DATABASE_USER]
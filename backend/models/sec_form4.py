@@ -1,9 +1,12 @@
 # models.py
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional
 
 
 class TransactionModel(BaseModel):
+    # Instances are cached and shared across requests, so keep them immutable.
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     filing_date: Optional[str] = Field(None, description="The filing date of the form")
     issuer_name: Optional[str] = Field(None, description="Name of the issuer")
     issuer_cik: Optional[str] = Field(None, description="Issuer CIK code")
@@ -23,3 +26,7 @@ class TransactionModel(BaseModel):
     is_officer: Optional[str] = Field(None, description="Officer relationship flag from filing")
     is_ten_percent_owner: Optional[str] = Field(None, description="10% owner relationship flag from filing")
     officer_title: Optional[str] = Field(None, description="Officer title from filing")
+
+
+# Mongo projection for exactly the fields TransactionModel serializes.
+TRANSACTION_PROJECTION = {"_id": 0, **{name: 1 for name in TransactionModel.model_fields}}
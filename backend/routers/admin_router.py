@@ -4,15 +4,25 @@ Admin router for scheduler management and per-ticker updates via external cron.
 
 import os
 import gc
+import time
+import asyncio
+import hashlib
+import json
 import logging
 import secrets
-from typing import Optional
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Query, Depends, status
-from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
+import concurrent.futures
+import functools
+from types import MappingProxyType
+from typing import Any, Optional
+from fastapi import APIRouter, HTTPException, Query, Depends, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.security.utils import get_authorization_scheme_param
 from database.database import user_db as db
 from services.auth_services import decode_access_token
+from services.sec_service import invalidate_transactions
 from scheduler import (
     get_scheduled_jobs,
+    trigger_all_updates_now,
     trigger_stock_update_now,
     trigger_sec_update_now,
     trigger_alert_scan_now,
@@ -26,21 +36,100 @@ from services.event_bus import (
     retry_event_bus_dead_letter,
 )
 from services.ops_events_service import list_ops_events
-from services.admin_access import is_admin_user
+from services.admin_access import ADMIN_USER_PROJECTION, EMAIL_COLLATION, is_admin_user
+from utils.limiter import AsyncTokenBucket
 
 logger = logging.getLogger(__name__)
 
-API_KEY_HEADER = APIKeyHeader(name="X-API-Key", auto_error=False)
-OAUTH2_OPTIONAL = OAuth2PasswordBearer(tokenUrl="auth/token", auto_error=False)
 ADMIN_API_KEY = os.getenv("ADMIN_API_KEY", "").strip()
 ALLOW_INSECURE_ADMIN = os.getenv("ALLOW_INSECURE_ADMIN", "false").strip().lower() == "true"
 
-VALID_TICKERS = [
+try:
+    ADMIN_SEQ_CONCURRENCY = max(1, int(os.getenv("ADMIN_SEQ_CONCURRENCY", "2").strip() or "2"))
+except ValueError:
+    ADMIN_SEQ_CONCURRENCY = 2
+
+try:
+    ADMIN_STOCK_RPS = max(0.1, float(os.getenv("ADMIN_STOCK_RPS", "1").strip() or "1"))
+except ValueError:
+    ADMIN_STOCK_RPS = 1.0
+
+try:
+    ADMIN_SEC_RPS = max(0.1, float(os.getenv("ADMIN_SEC_RPS", "0.5").strip() or "0.5"))
+except ValueError:
+    ADMIN_SEC_RPS = 0.5
+
+# Per-source pacing for the batch update: caps how fast tickers are started,
+# shared across requests, without idling a slot after every ticker.
+_STOCK_LIMITER = AsyncTokenBucket(ADMIN_STOCK_RPS, capacity=ADMIN_SEQ_CONCURRENCY)
+_SEC_LIMITER = AsyncTokenBucket(ADMIN_SEC_RPS, capacity=ADMIN_SEQ_CONCURRENCY)
+
+# Scraper calls are blocking; run them on a small dedicated pool so the event
+# loop keeps serving health checks and other requests during cron updates.
+ADMIN_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+    max_workers=max(2, ADMIN_SEQ_CONCURRENCY), thread_name_prefix="admin-cron"
+)
+
+
+# The scraper modules pull in yfinance/pandas/lxml, so they stay out of app
+# startup; each is imported once, on first use, instead of on every request.
+@functools.cache
+def _save_stock_data():
+    from scripts.stock_finance_data_extracton_script import save_stock_data
+    return save_stock_data
+
+
+@functools.cache
+def _insert_form4_data():
+    from scripts.sec_filing_data_extraction_script import insert_form4_data
+
+    def _insert_and_invalidate(ticker: str, cik: str) -> None:
+        insert_form4_data(ticker, cik)
+        invalidate_transactions(ticker)
+
+    return _insert_and_invalidate
+
+
+async def _run_blocking(func, *args):
+    """Run a blocking scraper call on ADMIN_EXECUTOR."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(ADMIN_EXECUTOR, func, *args)
+
+
+# /trigger/* jobs run for minutes; give them their own pool so they never occupy
+# the request-serving threadpool.
+try:
+    ADMIN_TRIGGER_WORKERS = max(1, int(os.getenv("ADMIN_TRIGGER_WORKERS", "2").strip() or "2"))
+except ValueError:
+    ADMIN_TRIGGER_WORKERS = 2
+
+_ADMIN_TRIGGER_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+    max_workers=ADMIN_TRIGGER_WORKERS, thread_name_prefix="admin-trig"
+)
+_pending_triggers: set[asyncio.Future] = set()
+
+
+def _on_trigger_done(future: asyncio.Future) -> None:
+    _pending_triggers.discard(future)
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("Admin trigger job failed: %s", future.exception(), exc_info=future.exception())
+
+
+def _submit_trigger(func) -> None:
+    """Fire-and-forget func on the admin trigger pool."""
+    future = asyncio.get_running_loop().run_in_executor(_ADMIN_TRIGGER_EXECUTOR, func)
+    _pending_triggers.add(future)
+    future.add_done_callback(_on_trigger_done)
+
+
+VALID_TICKERS = (
     "AAPL", "NVDA", "META", "GOOGL", "MSFT", "AMZN", "TSLA", "NFLX",
     "JPM", "JNJ", "V", "UNH", "HD", "DIS", "BAC", "XOM", "PG", "MA", "PEP", "WMT",
-]
+)
+_VALID_TICKER_SET = frozenset(VALID_TICKERS)
+_INVALID_TICKER_DETAIL = f"Invalid ticker. Must be one of: {', '.join(VALID_TICKERS)}"
 
-TICKER_CIK_MAPPING = {
+TICKER_CIK_MAPPING = MappingProxyType({
     "AAPL": "0000320193",
     "NVDA": "0001045810",
     "META": "0001326801",
@@ -61,63 +150,134 @@ TICKER_CIK_MAPPING = {
     "MA": "0001141391",
     "PEP": "0000077476",
     "WMT": "0000104169",
-}
+})
+# validate_ticker() only admits tickers that have a CIK, so the SEC route can index directly.
+assert _VALID_TICKER_SET == TICKER_CIK_MAPPING.keys(), "VALID_TICKERS and TICKER_CIK_MAPPING are out of sync"
+# Frozen (ticker, cik) pairs for the batch update loop; the mapping serves .get()
+TICKER_CIK_ITEMS: tuple[tuple[str, str], ...] = tuple(TICKER_CIK_MAPPING.items())
+
+# One in-flight single-ticker update per dataset; overlapping cron retries get a 409.
+_STOCK_UPDATE_LOCKS: dict[str, asyncio.Lock] = {ticker: asyncio.Lock() for ticker in VALID_TICKERS}
+_SEC_UPDATE_LOCKS: dict[str, asyncio.Lock] = {ticker: asyncio.Lock() for ticker in VALID_TICKERS}
+
+# /health is static, so serialize it once; probes revalidate with If-None-Match.
+_HEALTH_BODY = json.dumps({"status": "healthy", "tickers": VALID_TICKERS}, separators=(",", ":")).encode()
+_HEALTH_ETAG = f'"{hashlib.blake2b(_HEALTH_BODY, digest_size=8).hexdigest()}"'
+_HEALTH_HEADERS = {"ETag": _HEALTH_ETAG, "Cache-Control": "max-age=30"}
+
+# Scheduler introspection for /jobs is reused for a few seconds.
+_JOBS_CACHE_TTL_SECONDS = 5
+_jobs_cache: Optional[tuple[float, list]] = None
+
+
+def _get_cached_scheduled_jobs() -> list:
+    global _jobs_cache
+    now = time.monotonic()
+    if _jobs_cache is not None and now - _jobs_cache[0] < _JOBS_CACHE_TTL_SECONDS:
+        return _jobs_cache[1]
+    jobs = get_scheduled_jobs()
+    _jobs_cache = (now, jobs)
+    return jobs
+
+
+# Successful bearer checks are cached briefly, keyed by a digest of the token
+# (never the raw token), so polling admin dashboards skip the JWT verify and the
+# users lookup. Failures are not cached.
+_ADMIN_TOKEN_TTL_SECONDS = 60
+_ADMIN_TOKEN_CACHE_MAX = 1024
+_admin_token_cache: dict[bytes, tuple[float, float, str]] = {}  # digest -> (cached_at, exp, email)
+
+
+def _token_digest(token: str) -> bytes:
+    return hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+
+
+def _get_cached_admin_email(digest: bytes) -> Optional[str]:
+    entry = _admin_token_cache.get(digest)
+    if entry is None:
+        return None
+    cached_at, exp, email = entry
+    now = time.time()
+    if now - cached_at > _ADMIN_TOKEN_TTL_SECONDS or now >= exp:
+        _admin_token_cache.pop(digest, None)
+        return None
+    return email
+
+
+def _cache_admin_token(digest: bytes, exp: float, email: str) -> None:
+    if len(_admin_token_cache) >= _ADMIN_TOKEN_CACHE_MAX:
+        _admin_token_cache.clear()
+    _admin_token_cache[digest] = (time.time(), exp, email)
+
+
+# Rejections are static, so build them once. Each raise resets the traceback so
+# the shared instances do not accumulate frames across requests.
+_EXC_INVALID_BEARER = HTTPException(status.HTTP_401_UNAUTHORIZED, "Invalid bearer token.")
+_EXC_INVALID_PAYLOAD = HTTPException(status.HTTP_401_UNAUTHORIZED, "Invalid bearer token payload.")
+_EXC_USER_NOT_FOUND = HTTPException(status.HTTP_401_UNAUTHORIZED, "User not found.")
+_EXC_NOT_ADMIN = HTTPException(status.HTTP_403_FORBIDDEN, "Admin access required.")
+_EXC_INVALID_CREDS = HTTPException(status.HTTP_401_UNAUTHORIZED, "Missing or invalid admin credentials.")
+_EXC_CREDS_REQUIRED = HTTPException(
+    status.HTTP_401_UNAUTHORIZED,
+    "Admin credentials required. Use X-API-Key or an admin bearer token.",
+)
 
 
-async def verify_admin_access(
-    api_key_header: Optional[str] = Depends(API_KEY_HEADER),
-    bearer_token: Optional[str] = Depends(OAUTH2_OPTIONAL),
-):
+def _bearer_token(request: Request) -> Optional[str]:
+    scheme, token = get_authorization_scheme_param(request.headers.get("authorization"))
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return token
+
+
+async def verify_admin_access(request: Request):
     """
     Allow either:
     1) X-API-Key (for cron/infrastructure), or
     2) Bearer token for a user with admin role/flag.
+
+    Headers are read straight from the request, so the common cron case (API
+    key) returns before the Authorization header is even looked at.
     """
     # Legacy/local development fallback.
     if ALLOW_INSECURE_ADMIN and not ADMIN_API_KEY:
         return {"auth": "insecure"}
 
+    api_key_header = request.headers.get("x-api-key")
     if ADMIN_API_KEY and api_key_header and secrets.compare_digest(api_key_header, ADMIN_API_KEY):
         return {"auth": "api_key"}
 
+    bearer_token = _bearer_token(request)
     if bearer_token:
+        digest = _token_digest(bearer_token)
+        cached_email = _get_cached_admin_email(digest)
+        if cached_email:
+            return {"auth": "bearer", "email": cached_email}
+
         payload = decode_access_token(bearer_token)
         if not payload:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid bearer token.",
-            )
+            raise _EXC_INVALID_BEARER.with_traceback(None)
         email = str(payload.get("sub") or "").strip().lower()
         if not email:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid bearer token payload.",
-            )
+            raise _EXC_INVALID_PAYLOAD.with_traceback(None)
 
-        user = db.users.find_one({"email": email})
+        user = await run_in_threadpool(
+            db.users.find_one, {"email": email}, ADMIN_USER_PROJECTION, collation=EMAIL_COLLATION
+        )
         if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found.",
-            )
+            raise _EXC_USER_NOT_FOUND.with_traceback(None)
 
         if not is_admin_user(user):
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Admin access required.",
-            )
+            raise _EXC_NOT_ADMIN.with_traceback(None)
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            _cache_admin_token(digest, float(exp), email)
         return {"auth": "bearer", "email": email}
 
     if ADMIN_API_KEY:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Missing or invalid admin credentials.",
-        )
+        raise _EXC_INVALID_CREDS.with_traceback(None)
 
-    raise HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Admin credentials required. Use X-API-Key or an admin bearer token.",
-    )
+    raise _EXC_CREDS_REQUIRED.with_traceback(None)
 
 
 admin_router = APIRouter(dependencies=[Depends(verify_admin_access)])
@@ -125,21 +285,22 @@ admin_router = APIRouter(dependencies=[Depends(verify_admin_access)])
 
 def validate_ticker(ticker: str) -> str:
     """Validate and normalize ticker symbol."""
-    ticker = ticker.upper().strip()
-    if ticker not in VALID_TICKERS:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid ticker. Must be one of: {', '.join(VALID_TICKERS)}"
-        )
+    if ticker in _VALID_TICKER_SET:
+        return ticker
+    ticker = ticker.strip().upper()
+    if ticker not in _VALID_TICKER_SET:
+        raise HTTPException(status_code=400, detail=_INVALID_TICKER_DETAIL)
     return ticker
 
 
-@admin_router.get("/jobs")
-async def list_scheduled_jobs():
+# The list endpoints declare a response_model so FastAPI serializes them in
+# pydantic-core instead of walking them with jsonable_encoder + json.dumps.
+@admin_router.get("/jobs", response_model=dict[str, Any])
+def list_scheduled_jobs():
     """
     List all scheduled jobs and their next run times.
     """
-    jobs = get_scheduled_jobs()
+    jobs = _get_cached_scheduled_jobs()
     return {
         "status": "ok",
         "jobs": jobs
@@ -147,7 +308,7 @@ async def list_scheduled_jobs():
 
 
 @admin_router.get("/event-bus")
-async def event_bus_status():
+def event_bus_status():
     """
     Show current event bus backend and runtime status.
     """
@@ -157,8 +318,8 @@ async def event_bus_status():
     }
 
 
-@admin_router.get("/event-bus/dead-letters")
-async def event_bus_dead_letters(
+@admin_router.get("/event-bus/dead-letters", response_model=dict[str, Any])
+def event_bus_dead_letters(
     limit: int = Query(25, ge=1, le=200),
     status: str | None = Query(None, description="Filter by dead-letter status."),
 ):
@@ -171,7 +332,7 @@ async def event_bus_dead_letters(
 
 
 @admin_router.post("/event-bus/dead-letters/{dead_letter_id}/retry")
-async def retry_event_bus_dead_letter_item(dead_letter_id: str):
+def retry_event_bus_dead_letter_item(dead_letter_id: str):
     result = retry_event_bus_dead_letter(dead_letter_id)
     if not result.get("ok"):
         return {
@@ -185,7 +346,7 @@ async def retry_event_bus_dead_letter_item(dead_letter_id: str):
 
 
 @admin_router.post("/event-bus/dead-letters/retry-failed")
-async def retry_failed_event_bus_dead_letters_batch(
+def retry_failed_event_bus_dead_letters_batch(
     limit: int = Query(20, ge=1, le=500),
     include_retry_failed: bool = Query(True),
 ):
@@ -199,8 +360,8 @@ async def retry_failed_event_bus_dead_letters_batch(
     }
 
 
-@admin_router.get("/event-bus/ops-events")
-async def event_bus_ops_events(
+@admin_router.get("/event-bus/ops-events", response_model=dict[str, Any])
+def event_bus_ops_events(
     limit: int = Query(50, ge=1, le=500),
     dataset: str | None = Query(None, description="Optional dataset filter: stock|sec"),
     ticker: str | None = Query(None, description="Optional ticker filter."),
@@ -215,12 +376,12 @@ async def event_bus_ops_events(
 
 
 @admin_router.post("/trigger/stock")
-async def trigger_stock_update(background_tasks: BackgroundTasks):
+async def trigger_stock_update():
     """
     Manually trigger stock data update for ALL tickers.
     Runs in background to avoid timeout.
     """
-    background_tasks.add_task(trigger_stock_update_now)
+    _submit_trigger(trigger_stock_update_now)
     return {
         "status": "ok",
         "message": "Stock data update triggered. Running in background."
@@ -228,12 +389,12 @@ async def trigger_stock_update(background_tasks: BackgroundTasks):
 
 
 @admin_router.post("/trigger/sec")
-async def trigger_sec_update(background_tasks: BackgroundTasks):
+async def trigger_sec_update():
     """
     Manually trigger SEC Form 4 data update for ALL tickers.
     Runs in background to avoid timeout.
     """
-    background_tasks.add_task(trigger_sec_update_now)
+    _submit_trigger(trigger_sec_update_now)
     return {
         "status": "ok",
         "message": "SEC data update triggered. Running in background."
@@ -241,14 +402,12 @@ async def trigger_sec_update(background_tasks: BackgroundTasks):
 
 
 @admin_router.post("/trigger/all")
-async def trigger_all_updates(background_tasks: BackgroundTasks):
+async def trigger_all_updates():
     """
     Manually trigger all data updates.
     Runs in background to avoid timeout.
     """
-    background_tasks.add_task(trigger_stock_update_now)
-    background_tasks.add_task(trigger_sec_update_now)
-    background_tasks.add_task(trigger_alert_scan_now)
+    _submit_trigger(trigger_all_updates_now)
     return {
         "status": "ok",
         "message": "All data updates triggered (stock, SEC, alerts). Running in background."
@@ -256,12 +415,12 @@ async def trigger_all_updates(background_tasks: BackgroundTasks):
 
 
 @admin_router.post("/trigger/alerts")
-async def trigger_alert_scan(background_tasks: BackgroundTasks):
+async def trigger_alert_scan():
     """
     Manually trigger alert event scanning for users with active rules.
     Runs in background to avoid timeout.
     """
-    background_tasks.add_task(trigger_alert_scan_now)
+    _submit_trigger(trigger_alert_scan_now)
     return {
         "status": "ok",
         "message": "Alert event scan triggered. Running in background."
@@ -269,12 +428,12 @@ async def trigger_alert_scan(background_tasks: BackgroundTasks):
 
 
 @admin_router.post("/trigger/digest")
-async def trigger_daily_digest(background_tasks: BackgroundTasks):
+async def trigger_daily_digest():
     """
     Manually trigger daily digest dispatch cycle.
     Runs in background to avoid timeout.
     """
-    background_tasks.add_task(trigger_daily_digest_now)
+    _submit_trigger(trigger_daily_digest_now)
     return {
         "status": "ok",
         "message": "Daily digest dispatch triggered. Running in background."
@@ -282,12 +441,12 @@ async def trigger_daily_digest(background_tasks: BackgroundTasks):
 
 
 @admin_router.post("/trigger/event-bus-dlq-retry")
-async def trigger_event_bus_dlq_retry(background_tasks: BackgroundTasks):
+async def trigger_event_bus_dlq_retry():
     """
     Manually trigger event bus dead-letter retry cycle.
     Runs in background to avoid timeout.
     """
-    background_tasks.add_task(trigger_event_bus_dlq_retry_now)
+    _submit_trigger(trigger_event_bus_dlq_retry_now)
     return {
         "status": "ok",
         "message": "Event bus DLQ retry triggered. Running in background."
@@ -307,23 +466,30 @@ async def update_single_stock(
     - Method: GET
     - Schedule: Every 15 minutes (stagger different tickers)
     """
-    from scripts.stock_finance_data_extracton_script import save_stock_data
+    save_stock_data = _save_stock_data()
     
     ticker = validate_ticker(ticker)
     
+    lock = _STOCK_UPDATE_LOCKS[ticker]
+    if lock.locked():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Stock data update already in progress for {ticker}"
+        )
+
     try:
-        logger.info(f"[CRON] Updating stock data for {ticker}")
-        save_stock_data(ticker)
-        gc.collect()
+        logger.info("[CRON] Updating stock data for %s", ticker)
+        async with lock:
+            await _run_blocking(save_stock_data, ticker)
         
-        logger.info(f"[CRON] Stock data updated successfully for {ticker}")
+        logger.info("[CRON] Stock data updated successfully for %s", ticker)
         return {
             "status": "ok",
             "ticker": ticker,
             "message": f"Stock data updated for {ticker}"
         }
     except Exception as e:
-        logger.error(f"[CRON] Failed to update stock data for {ticker}: {e}")
+        logger.error("[CRON] Failed to update stock data for %s: %s", ticker, e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to update stock data for {ticker}: {str(e)}"
@@ -343,23 +509,24 @@ async def update_single_sec(
     - Method: GET
     - Schedule: Daily (stagger different tickers by 5 minutes)
     """
-    from scripts.sec_filing_data_extraction_script import insert_form4_data
+    insert_form4_data = _insert_form4_data()
     
     ticker = validate_ticker(ticker)
-    cik = TICKER_CIK_MAPPING.get(ticker)
+    cik = TICKER_CIK_MAPPING[ticker]
     
-    if not cik:
+    lock = _SEC_UPDATE_LOCKS[ticker]
+    if lock.locked():
         raise HTTPException(
-            status_code=400,
-            detail=f"No CIK mapping found for ticker {ticker}"
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"SEC data update already in progress for {ticker}"
         )
-    
+
     try:
-        logger.info(f"[CRON] Updating SEC data for {ticker} (CIK: {cik})")
-        insert_form4_data(ticker, cik)
-        gc.collect()
+        logger.info("[CRON] Updating SEC data for %s (CIK: %s)", ticker, cik)
+        async with lock:
+            await _run_blocking(insert_form4_data, ticker, cik)
         
-        logger.info(f"[CRON] SEC data updated successfully for {ticker}")
+        logger.info("[CRON] SEC data updated successfully for %s", ticker)
         return {
             "status": "ok",
             "ticker": ticker,
@@ -367,7 +534,7 @@ async def update_single_sec(
             "message": f"SEC Form 4 data updated for {ticker}"
         }
     except Exception as e:
-        logger.error(f"[CRON] Failed to update SEC data for {ticker}: {e}")
+        logger.error("[CRON] Failed to update SEC data for %s: %s", ticker, e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to update SEC data for {ticker}: {str(e)}"
@@ -379,43 +546,46 @@ async def update_all_sequential(
     type: str = Query("both", description="Update type: stock, sec, or both")
 ):
     """
-    Update data for all tickers sequentially with memory cleanup between each.
-    This is safer for memory-constrained environments.
+    Update data for all tickers with at most ADMIN_SEQ_CONCURRENCY tickers in
+    flight at once; ticker starts are paced per source (ADMIN_STOCK_RPS /
+    ADMIN_SEC_RPS) to stay polite to Yahoo/SEC. Per-ticker success/error
+    reporting is unchanged.
     
     Note: This may take several minutes to complete.
     """
-    from scripts.stock_finance_data_extracton_script import save_stock_data
-    from scripts.sec_filing_data_extraction_script import insert_form4_data
-    import time
+    save_stock_data = _save_stock_data()
+    insert_form4_data = _insert_form4_data()
     
+    sem = asyncio.Semaphore(ADMIN_SEQ_CONCURRENCY)
+
+    async def _update(label: str, func, ticker: str, *args, pacer: AsyncTokenBucket) -> str:
+        async with sem:
+            try:
+                await pacer.acquire()
+                logger.info("[SEQUENTIAL] Updating %s for %s", label, ticker)
+                await _run_blocking(func, ticker, *args)
+                return "success"
+            except Exception as e:
+                logger.error("[SEQUENTIAL] %s update failed for %s: %s", label, ticker, e)
+                return f"error: {str(e)}"
+
     results = {
         "stock": {},
         "sec": {}
     }
     if type in ["stock", "both"]:
-        for ticker in VALID_TICKERS:
-            try:
-                logger.info(f"[SEQUENTIAL] Updating stock for {ticker}")
-                save_stock_data(ticker)
-                results["stock"][ticker] = "success"
-                gc.collect()
-                time.sleep(1)
-            except Exception as e:
-                logger.error(f"[SEQUENTIAL] Stock update failed for {ticker}: {e}")
-                results["stock"][ticker] = f"error: {str(e)}"
-                gc.collect()
+        outcomes = await asyncio.gather(
+            *(_update("stock", save_stock_data, ticker, pacer=_STOCK_LIMITER) for ticker in VALID_TICKERS)
+        )
+        results["stock"] = dict(zip(VALID_TICKERS, outcomes))
     if type in ["sec", "both"]:
-        for ticker, cik in TICKER_CIK_MAPPING.items():
-            try:
-                logger.info(f"[SEQUENTIAL] Updating SEC for {ticker}")
-                insert_form4_data(ticker, cik)
-                results["sec"][ticker] = "success"
-                gc.collect()
-                time.sleep(2)
-            except Exception as e:
-                logger.error(f"[SEQUENTIAL] SEC update failed for {ticker}: {e}")
-                results["sec"][ticker] = f"error: {str(e)}"
-                gc.collect()
+        outcomes = await asyncio.gather(
+            *(_update("SEC", insert_form4_data, ticker, cik, pacer=_SEC_LIMITER) for ticker, cik in TICKER_CIK_ITEMS)
+        )
+        results["sec"] = {ticker: outcome for (ticker, _cik), outcome in zip(TICKER_CIK_ITEMS, outcomes)}
+
+    # One full collection after the whole batch rather than one per ticker
+    await _run_blocking(gc.collect)
     
     return {
         "status": "ok",
@@ -425,11 +595,11 @@ async def update_all_sequential(
 
 
 @admin_router.get("/health")
-async def health_check():
+async def health_check(request: Request):
     """
     Simple health check endpoint for monitoring.
+    Serves a precomputed body and answers 304 when the probe's ETag matches.
     """
-    return {
-        "status": "healthy",
-        "tickers": VALID_TICKERS
-    }
+    if request.headers.get("if-none-match") == _HEALTH_ETAG:
+        return Response(status_code=304, headers=_HEALTH_HEADERS)
+    return Response(content=_HEALTH_BODY, media_type="application/json", headers=_HEALTH_HEADERS)
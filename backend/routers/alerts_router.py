@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import bisect
+import concurrent.futures
+import functools
 import hashlib
+import itertools
 import logging
 import os
 import time
-from collections import defaultdict
 from datetime import date, datetime, timedelta, timezone
 from typing import Any, Literal
 
@@ -12,13 +15,13 @@ from bson import ObjectId
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel, Field, field_validator, model_validator
-from pymongo.errors import DuplicateKeyError
+from pymongo.errors import BulkWriteError
 
 from database.database import user_db
 from models.users import MessageResponse
 from services.auth_services import decode_access_token
 from services.event_bus import TOPIC_ALERTS_NOTIFICATION_DISPATCH, publish_event
-from services.sec_service import get_all_transactions
+from services.sec_service import get_purchase_rows, on_transactions_invalidated
 from utils.limiter import limiter
 
 logger = logging.getLogger(__name__)
@@ -28,8 +31,19 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
 ALERT_RULES_COLLECTION = user_db["alert_rules"]
 ALERT_EVENTS_COLLECTION = user_db["alert_events"]
-
-_indexes_initialized = False
+# Only the fields _scan_rule reads; name/timestamps stay on the server during scans.
+_SCAN_RULE_PROJECTION = {
+    "_id": 1,
+    "user_email": 1,
+    "ticker": 1,
+    "rule_type": 1,
+    "threshold": 1,
+    "lookback_days": 1,
+    "metric_type": 1,
+    "comparator": 1,
+    "threshold_unit": 1,
+    "window": 1,
+}
 
 
 RuleType = Literal["large_buy", "repeat_buyer", "cluster_buying"]
@@ -44,8 +58,17 @@ SEVERITY_RANK = {
     "low": 1,
 }
 
+# Normalized buys per (ticker, period), reused across scans for as long as
+# get_purchase_rows keeps returning the same cached list.
+_BUYS_CACHE_MAX = 2048
+_buys_cache: dict[tuple[str, str], tuple[list[Any], list[dict[str, Any]]]] = {}
+
 _FLOAT_SHARES_TTL_SECONDS = 6 * 3600
 _float_shares_cache: dict[str, tuple[float, float]] = {}
+try:
+    ALERT_SCAN_WORKERS = max(1, int(os.getenv("ALERT_SCAN_WORKERS", "4").strip() or "4"))
+except ValueError:
+    ALERT_SCAN_WORKERS = 4
 ENABLE_ALERT_NOTIFICATION_EVENT_BUS = os.getenv("ENABLE_ALERT_NOTIFICATION_EVENT_BUS", "true").strip().lower() == "true"
 
 RULE_LABELS: dict[RuleType, str] = {
@@ -138,18 +161,21 @@ class AlertSummaryOut(BaseModel):
     items: list[AlertSummaryItemOut]
 
 
-def _ensure_indexes() -> None:
-    global _indexes_initialized
-    if _indexes_initialized:
-        return
-
+def ensure_alert_indexes() -> None:
+    """Create alert indexes; called once from the app lifespan, not per request."""
     ALERT_RULES_COLLECTION.create_index([("user_email", 1), ("created_at", -1)])
     ALERT_RULES_COLLECTION.create_index([("user_email", 1), ("is_active", 1)])
+    ALERT_RULES_COLLECTION.create_index([("is_active", 1), ("user_email", 1)])
 
     ALERT_EVENTS_COLLECTION.create_index([("user_email", 1), ("created_at", -1)])
     ALERT_EVENTS_COLLECTION.create_index([("user_email", 1), ("is_read", 1), ("created_at", -1)])
+    # Equality fields first, sort last: covers get_alert_summary's high-severity unread
+    # count_documents (counts inside $facet could not use it).
+    ALERT_EVENTS_COLLECTION.create_index(
+        [("user_email", 1), ("is_read", 1), ("severity", 1), ("created_at", -1)],
+        name="user_read_sev_created",
+    )
     ALERT_EVENTS_COLLECTION.create_index([("user_email", 1), ("fingerprint", 1)], unique=True)
-    _indexes_initialized = True
 
 
 def _to_iso(value: Any) -> str:
@@ -182,19 +208,28 @@ def _parse_day(value: Any) -> date | None:
     return None
 
 
+_NUMBER_STRIP_TABLE = str.maketrans("", "", ",$")
+
+
 def _parse_number(value: Any) -> float:
+    # Exact type checks first: Mongo hands back float/int for nearly every row.
+    value_type = type(value)
+    if value_type is float:
+        return value
+    if value_type is int:
+        return float(value)
     if value is None:
         return 0.0
-    if isinstance(value, (int, float)):
-        return float(value)
-    if isinstance(value, str):
-        cleaned = value.strip().replace(",", "").replace("$", "")
+    if value_type is str:
+        cleaned = value.strip().translate(_NUMBER_STRIP_TABLE)
         if cleaned.startswith("(") and cleaned.endswith(")"):
             cleaned = f"-{cleaned[1:-1]}"
         try:
             return float(cleaned)
         except ValueError:
             return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
     return 0.0
 
 
@@ -268,10 +303,12 @@ def _period_for_days(days: int) -> str:
     return "1y"
 
 
+# The _serialize_* helpers build response models with model_construct: every field
+# is coerced here from documents this service wrote, so pydantic validation is skipped.
 def _serialize_rule(doc: dict[str, Any]) -> AlertRuleOut:
     metric_type = str(doc.get("metric_type", "shares"))
     threshold_unit = str(doc.get("threshold_unit", "shares" if metric_type == "shares" else "percent"))
-    return AlertRuleOut(
+    return AlertRuleOut.model_construct(
         id=str(doc["_id"]),
         ticker=str(doc.get("ticker", "")),
         rule_type=doc.get("rule_type"),
@@ -289,7 +326,7 @@ def _serialize_rule(doc: dict[str, Any]) -> AlertRuleOut:
 
 
 def _serialize_event(doc: dict[str, Any]) -> AlertEventOut:
-    return AlertEventOut(
+    return AlertEventOut.model_construct(
         id=str(doc["_id"]),
         rule_id=str(doc.get("rule_id")),
         ticker=str(doc.get("ticker", "")),
@@ -305,7 +342,7 @@ def _serialize_event(doc: dict[str, Any]) -> AlertEventOut:
 
 
 def _serialize_summary_item(doc: dict[str, Any]) -> AlertSummaryItemOut:
-    return AlertSummaryItemOut(
+    return AlertSummaryItemOut.model_construct(
         id=str(doc["_id"]),
         ticker=str(doc.get("ticker", "")),
         title=str(doc.get("title", "Alert")),
@@ -331,9 +368,9 @@ def _alert_priority_score(doc: dict[str, Any]) -> float:
 
 
 def _serialize_feed_item(doc: dict[str, Any]) -> AlertFeedItemOut:
-    payload = _serialize_event(doc).model_dump()
+    payload = dict(_serialize_event(doc))
     payload["priority_score"] = _alert_priority_score(doc)
-    return AlertFeedItemOut(**payload)
+    return AlertFeedItemOut.model_construct(**payload)
 
 
 def _tx_value(tx: Any, key: str) -> Any:
@@ -342,28 +379,19 @@ def _tx_value(tx: Any, key: str) -> Any:
     return getattr(tx, key, None)
 
 
-def _compute_buys_for_rule(
-    rule: dict[str, Any],
-    transactions_cache: dict[tuple[str, str], list[Any]],
-) -> list[dict[str, Any]]:
-    ticker = str(rule.get("ticker", "")).upper()
-    lookback_days = int(rule.get("lookback_days", 30))
-    period = _period_for_days(lookback_days)
-    cache_key = (ticker, period)
+def _buy_day(buy: dict[str, Any]) -> date:
+    return buy["transaction_day"]
 
-    if cache_key not in transactions_cache:
-        transactions_cache[cache_key] = get_all_transactions(ticker, period) or []
 
-    since_day = (datetime.now(timezone.utc) - timedelta(days=lookback_days)).date()
+def _normalize_buys(transactions: list[Any]) -> list[dict[str, Any]]:
+    """
+    Parse purchase rows into buys sorted by transaction day. Rows come from
+    get_purchase_rows, which already restricts them to transaction code P.
+    """
     buys: list[dict[str, Any]] = []
-
-    for tx in transactions_cache[cache_key]:
-        transaction_code = str(_tx_value(tx, "transaction_code") or "").upper().strip()
-        if transaction_code != "P":
-            continue
-
+    for tx in transactions:
         transaction_day = _parse_day(_tx_value(tx, "transaction_date"))
-        if transaction_day is None or transaction_day < since_day:
+        if transaction_day is None:
             continue
 
         shares = _parse_number(_tx_value(tx, "shares"))
@@ -385,18 +413,87 @@ def _compute_buys_for_rule(
             }
         )
 
+    buys.sort(key=_buy_day)
     return buys
 
 
-def _insert_event_if_new(user_email: str, event_doc: dict[str, Any]) -> bool:
+def _get_buys(ticker: str, period: str) -> list[dict[str, Any]]:
+    """
+    Day-sorted buys for (ticker, period). get_purchase_rows serves a TTL-cached
+    list of P rows that is dropped when new filings are ingested; as long as it
+    hands back the same list object the normalized form is reused across scans.
+    """
+    rows = get_purchase_rows(ticker, period)
+    cached = _buys_cache.get((ticker, period))
+    if cached is not None and cached[0] is rows:
+        return cached[1]
+    buys = _normalize_buys(rows)
+    if len(_buys_cache) >= _BUYS_CACHE_MAX:
+        _buys_cache.clear()
+    _buys_cache[(ticker, period)] = (rows, buys)
+    return buys
+
+
+@on_transactions_invalidated
+def _drop_buys(ticker: str) -> None:
+    """Release the ticker's buys (and the row lists they pin) on new filings."""
+    for key in list(_buys_cache):
+        if key[0] == ticker:
+            _buys_cache.pop(key, None)
+
+
+@functools.lru_cache(maxsize=16)
+def _lookback_bucket(lookback_days: int, today: date) -> tuple[str, date]:
+    """(period, since_day) for a lookback; rules share a handful of distinct values."""
+    return _period_for_days(lookback_days), today - timedelta(days=lookback_days)
+
+
+def _compute_buys_for_rule(
+    rule: dict[str, Any],
+    transactions_cache: dict[tuple[str, str], list[dict[str, Any]]],
+    *,
+    now: datetime,
+) -> list[dict[str, Any]]:
+    """
+    Buys inside the rule's lookback window. The cache holds each (ticker, period)
+    already reduced to day-sorted buys, so further rules on the same ticker only
+    bisect to their start day. Callers get a fresh list but shared buy dicts.
+    """
+    ticker = str(rule.get("ticker", "")).upper()
+    period, since_day = _lookback_bucket(int(rule.get("lookback_days", 30)), now.date())
+    cache_key = (ticker, period)
+
+    buys = transactions_cache.get(cache_key)
+    if buys is None:
+        buys = transactions_cache[cache_key] = _get_buys(ticker, period)
+
+    return buys[bisect.bisect_left(buys, since_day, key=_buy_day):]
+
+
+def _insert_events_if_new(event_docs: list[dict[str, Any]]) -> int:
+    """
+    Insert a scan's candidate events in one round trip. The unique
+    (user_email, fingerprint) index rejects events already stored; with
+    ordered=False the rest of the batch is still written.
+    """
+    if not event_docs:
+        return 0
     try:
-        ALERT_EVENTS_COLLECTION.insert_one(event_doc)
-        return True
-    except DuplicateKeyError:
-        return False
+        return len(ALERT_EVENTS_COLLECTION.insert_many(event_docs, ordered=False).inserted_ids)
+    except BulkWriteError as exc:
+        unexpected = [error for error in exc.details.get("writeErrors", []) if error.get("code") != 11000]
+        if unexpected:
+            logger.warning("Failed to insert %d alert events: %s", len(unexpected), unexpected[0].get("errmsg"))
+        return int(exc.details.get("nInserted", 0))
     except Exception as exc:
-        logger.warning("Failed to insert alert event: %s", exc, exc_info=True)
-        return False
+        logger.warning("Failed to insert alert events: %s", exc, exc_info=True)
+        return 0
+
+
+@functools.lru_cache(maxsize=1024)
+def _fingerprint_prefix(user_email: str) -> "hashlib._Hash":
+    """SHA-256 state already fed the user's `email|` prefix; callers copy() it per event."""
+    return hashlib.sha256(f"{user_email}|".encode("utf-8"))
 
 
 def _build_base_event(
@@ -410,9 +507,11 @@ def _build_base_event(
     severity: Literal["low", "medium", "high"],
     occurred_at: datetime,
     details: dict[str, Any],
+    now: datetime,
 ) -> dict[str, Any]:
-    fingerprint = hashlib.sha256(f"{user_email}|{fingerprint_key}".encode("utf-8")).hexdigest()
-    now = datetime.now(timezone.utc)
+    hasher = _fingerprint_prefix(user_email).copy()
+    hasher.update(fingerprint_key.encode("utf-8"))
+    fingerprint = hasher.hexdigest()
     return {
         "user_email": user_email,
         "rule_id": str(rule["_id"]),
@@ -467,21 +566,24 @@ def _scan_rule(
     *,
     user_email: str,
     rule: dict[str, Any],
-    transactions_cache: dict[tuple[str, str], list[Any]],
-) -> int:
+    transactions_cache: dict[tuple[str, str], list[dict[str, Any]]],
+    now: datetime,
+) -> list[dict[str, Any]]:
+    """Build the candidate event docs for one rule; the caller inserts them, stamped `now`."""
     rule_type = rule.get("rule_type")
     ticker = str(rule.get("ticker", "")).upper()
     threshold = float(rule.get("threshold", 0))
-    generated = 0
+    event_docs: list[dict[str, Any]] = []
 
-    buys = _compute_buys_for_rule(rule, transactions_cache)
+    buys = _compute_buys_for_rule(rule, transactions_cache, now=now)
     if not buys:
-        return 0
+        return event_docs
 
     if rule_type == "large_buy":
         metric_type = str(rule.get("metric_type", "shares"))
         comparator: ComparatorType = str(rule.get("comparator", "gte"))  # type: ignore[assignment]
         threshold_unit = str(rule.get("threshold_unit", "shares" if metric_type == "shares" else "percent"))
+        occurred_by_day: dict[date, datetime] = {}
         for buy in buys:
             metric_value, metric_metadata = _metric_value_for_large_buy(rule=rule, ticker=ticker, buy=buy)
             if metric_value is None:
@@ -500,12 +602,10 @@ def _scan_rule(
                 else f"{int(threshold):,} shares"
             )
 
-            occurred_at = datetime(
-                buy["transaction_day"].year,
-                buy["transaction_day"].month,
-                buy["transaction_day"].day,
-                tzinfo=timezone.utc,
-            )
+            occurred_at = occurred_by_day.get(buy["transaction_day"])
+            if occurred_at is None:
+                day = buy["transaction_day"]
+                occurred_at = occurred_by_day[day] = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
             fingerprint_key = (
                 f"large_buy|{rule['_id']}|{ticker}|{buy['transaction_day'].isoformat()}|"
                 f"{buy['owner']}|{metric_type}|{metric_value:.8f}|{comparator}|{threshold:.8f}"
@@ -535,51 +635,53 @@ def _scan_rule(
                     "ownership_change_pct": buy.get("ownership_change_pct"),
                     **metric_metadata,
                 },
+                now=now,
             )
-            if _insert_event_if_new(user_email, event_doc):
-                generated += 1
+            event_docs.append(event_doc)
 
     elif rule_type == "repeat_buyer":
         min_buys = max(1, int(threshold))
-        by_owner: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        # Buys arrive day-sorted, so one pass yields each owner's count, share total and latest day.
+        by_owner: dict[str, tuple[int, float, date]] = {}
         for buy in buys:
-            by_owner[buy["owner"]].append(buy)
+            count, shares, _latest = by_owner.get(buy["owner"], (0, 0.0, None))
+            by_owner[buy["owner"]] = (count + 1, shares + buy["shares"], buy["transaction_day"])
 
-        for owner, owner_buys in by_owner.items():
-            if len(owner_buys) < min_buys:
+        for owner, (buy_count, total_shares, latest_day) in by_owner.items():
+            if buy_count < min_buys:
                 continue
 
-            owner_buys.sort(key=lambda row: row["transaction_day"])
-            latest_day = owner_buys[-1]["transaction_day"]
-            total_shares = sum(row["shares"] for row in owner_buys)
             occurred_at = datetime(latest_day.year, latest_day.month, latest_day.day, tzinfo=timezone.utc)
-            fingerprint_key = f"repeat_buyer|{rule['_id']}|{ticker}|{owner}|{latest_day.isoformat()}|{len(owner_buys)}"
+            fingerprint_key = f"repeat_buyer|{rule['_id']}|{ticker}|{owner}|{latest_day.isoformat()}|{buy_count}"
             event_doc = _build_base_event(
                 user_email=user_email,
                 rule=rule,
                 ticker=ticker,
                 fingerprint_key=fingerprint_key,
                 title=f"{ticker}: repeat insider buyer",
-                message=f"{owner} logged {len(owner_buys)} buy transactions in the lookback window.",
+                message=f"{owner} logged {buy_count} buy transactions in the lookback window.",
                 severity="medium",
                 occurred_at=occurred_at,
                 details={
                     "owner": owner,
-                    "buy_count": len(owner_buys),
+                    "buy_count": buy_count,
                     "total_shares": total_shares,
                     "threshold": min_buys,
                 },
+                now=now,
             )
-            if _insert_event_if_new(user_email, event_doc):
-                generated += 1
+            event_docs.append(event_doc)
 
     elif rule_type == "cluster_buying":
         min_transactions = max(1, int(threshold))
         if len(buys) >= min_transactions:
-            buys.sort(key=lambda row: row["transaction_day"])
             latest_day = buys[-1]["transaction_day"]
-            unique_insiders = len({row["owner"] for row in buys})
-            total_shares = sum(row["shares"] for row in buys)
+            owners: set[str] = set()
+            total_shares = 0.0
+            for buy in buys:
+                owners.add(buy["owner"])
+                total_shares += buy["shares"]
+            unique_insiders = len(owners)
             occurred_at = datetime(latest_day.year, latest_day.month, latest_day.day, tzinfo=timezone.utc)
             fingerprint_key = (
                 f"cluster_buying|{rule['_id']}|{ticker}|{latest_day.isoformat()}|"
@@ -600,11 +702,11 @@ def _scan_rule(
                     "total_shares": total_shares,
                     "threshold": min_transactions,
                 },
+                now=now,
             )
-            if _insert_event_if_new(user_email, event_doc):
-                generated += 1
+            event_docs.append(event_doc)
 
-    return generated
+    return event_docs
 
 
 def _recent_events_for_dispatch(
@@ -650,27 +752,39 @@ def _dispatch_realtime_notifications_fallback(*, user_email: str, scan_started_a
 def run_alert_scan_for_user(
     user_email: str,
     *,
-    transactions_cache: dict[tuple[str, str], list[Any]] | None = None,
+    transactions_cache: dict[tuple[str, str], list[dict[str, Any]]] | None = None,
 ) -> tuple[int, int]:
     """
     Execute all active alert rules for one user.
 
     Returns: (generated_events, total_active_rules)
     """
-    _ensure_indexes()
-    scan_started_at = datetime.now(timezone.utc)
-    rules = list(ALERT_RULES_COLLECTION.find({"user_email": user_email, "is_active": True}))
+    rules = list(ALERT_RULES_COLLECTION.find({"user_email": user_email, "is_active": True}, _SCAN_RULE_PROJECTION))
     if not rules:
         return 0, 0
+    return _scan_rules_for_user(user_email, rules, transactions_cache=transactions_cache), len(rules)
+
 
-    generated = 0
+def _scan_rules_for_user(
+    user_email: str,
+    rules: list[dict[str, Any]],
+    *,
+    transactions_cache: dict[tuple[str, str], list[dict[str, Any]]] | None = None,
+) -> int:
+    """Scan already-fetched active rules for one user and dispatch notifications."""
+    scan_started_at = datetime.now(timezone.utc)
+    event_docs: list[dict[str, Any]] = []
     cache = transactions_cache if transactions_cache is not None else {}
     for rule in rules:
         try:
-            generated += _scan_rule(user_email=user_email, rule=rule, transactions_cache=cache)
+            event_docs.extend(
+                _scan_rule(user_email=user_email, rule=rule, transactions_cache=cache, now=scan_started_at)
+            )
         except Exception as exc:
             logger.warning("Failed to scan alert rule %s: %s", str(rule.get("_id")), exc, exc_info=True)
 
+    generated = _insert_events_if_new(event_docs)
+
     if generated > 0:
         try:
             published = False
@@ -689,38 +803,54 @@ def run_alert_scan_for_user(
         except Exception as exc:
             logger.warning("Realtime notification dispatch failed for %s: %s", user_email, exc, exc_info=True)
 
-    return generated, len(rules)
+    return generated
 
 
 def run_alert_scan_for_all_users(*, limit_users: int | None = None) -> dict[str, int]:
     """
     Execute active alert rules for all users that have at least one active rule.
     """
-    _ensure_indexes()
-    active_user_emails = ALERT_RULES_COLLECTION.distinct("user_email", {"is_active": True})
-    if limit_users is not None and limit_users > 0:
-        active_user_emails = active_user_emails[:limit_users]
+    # One query for every active rule, ordered so each user's rules are contiguous.
+    # Rule docs are small; materializing them keeps the cursor from idling out
+    # while slow per-user scans run.
+    active_rules = list(ALERT_RULES_COLLECTION.find({"is_active": True}, _SCAN_RULE_PROJECTION).sort("user_email", 1))
+    rules_by_user = itertools.groupby(active_rules, key=lambda rule: rule.get("user_email"))
+
+    max_users = limit_users if limit_users is not None and limit_users > 0 else None
+    user_batches = [
+        (str(user_email), list(user_rules))
+        for user_email, user_rules in itertools.islice(rules_by_user, max_users)
+        if user_email
+    ]
 
     scanned_users = 0
     failed_users = 0
     generated_events = 0
     total_rules = 0
-    shared_transactions_cache: dict[tuple[str, str], list[Any]] = {}
-
-    for user_email in active_user_emails:
-        if not user_email:
-            continue
-        try:
-            generated, rule_count = run_alert_scan_for_user(
-                str(user_email),
-                transactions_cache=shared_transactions_cache,
+    # Shared across workers without a lock: entries are only ever added whole,
+    # and two workers missing the same key at once just compute it twice.
+    shared_transactions_cache: dict[tuple[str, str], list[dict[str, Any]]] = {}
+
+    # Per-user scans are independent and mostly wait on Mongo, so run a few at once.
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=max(1, min(ALERT_SCAN_WORKERS, len(user_batches))), thread_name_prefix="alert-scan"
+    ) as pool:
+        futures = {
+            pool.submit(_scan_rules_for_user, user_email, rules, transactions_cache=shared_transactions_cache): (
+                user_email,
+                len(rules),
             )
-            generated_events += generated
-            total_rules += rule_count
-            scanned_users += 1
-        except Exception as exc:
-            failed_users += 1
-            logger.warning("Failed to scan alerts for user %s: %s", user_email, exc, exc_info=True)
+            for user_email, rules in user_batches
+        }
+        for future in concurrent.futures.as_completed(futures):
+            user_email, rule_count = futures[future]
+            try:
+                generated_events += future.result()
+                total_rules += rule_count
+                scanned_users += 1
+            except Exception as exc:
+                failed_users += 1
+                logger.warning("Failed to scan alerts for user %s: %s", user_email, exc, exc_info=True)
 
     return {
         "scanned_users": scanned_users,
@@ -737,7 +867,6 @@ def create_alert_rule(
     payload: AlertRuleCreate,
     user_email: str = Depends(_get_user_email),
 ) -> AlertRuleOut:
-    _ensure_indexes()
     now = datetime.now(timezone.utc)
     rule_name = (payload.name or f"{RULE_LABELS[payload.rule_type]} • {payload.ticker}").strip()
 
@@ -767,7 +896,6 @@ def list_alert_rules(
     request: Request,
     user_email: str = Depends(_get_user_email),
 ) -> list[AlertRuleOut]:
-    _ensure_indexes()
     docs = ALERT_RULES_COLLECTION.find({"user_email": user_email}).sort("created_at", -1)
     return [_serialize_rule(doc) for doc in docs]
 
@@ -779,7 +907,6 @@ def delete_alert_rule(
     rule_id: str,
     user_email: str = Depends(_get_user_email),
 ) -> MessageResponse:
-    _ensure_indexes()
     try:
         object_id = ObjectId(rule_id)
     except Exception as exc:
@@ -810,7 +937,6 @@ def list_alert_events(
     unread_only: bool = Query(False),
     user_email: str = Depends(_get_user_email),
 ) -> list[AlertEventOut]:
-    _ensure_indexes()
     query: dict[str, Any] = {"user_email": user_email}
     if unread_only:
         query["is_read"] = False
@@ -827,7 +953,6 @@ def list_alert_feed(
     unread_only: bool = Query(True),
     user_email: str = Depends(_get_user_email),
 ) -> list[AlertFeedItemOut]:
-    _ensure_indexes()
     query: dict[str, Any] = {"user_email": user_email}
     if unread_only:
         query["is_read"] = False
@@ -851,16 +976,37 @@ def get_alert_summary(
     limit: int = Query(5, ge=1, le=20),
     user_email: str = Depends(_get_user_email),
 ) -> AlertSummaryOut:
-    _ensure_indexes()
+    # Both counts are covered by the (user_email, is_read[, severity]) indexes.
     unread_query = {"user_email": user_email, "is_read": False}
     unread_count = ALERT_EVENTS_COLLECTION.count_documents(unread_query)
     high_severity_unread = ALERT_EVENTS_COLLECTION.count_documents({**unread_query, "severity": "high"})
 
-    latest_doc = ALERT_EVENTS_COLLECTION.find_one({"user_email": user_email}, sort=[("created_at", -1)])
-    latest_event_at = _to_iso(latest_doc.get("created_at")) if latest_doc else None
-
-    preview_docs = ALERT_EVENTS_COLLECTION.find(unread_query).sort("created_at", -1).limit(limit)
-    preview_items = [_serialize_summary_item(doc) for doc in preview_docs]
+    # Newest event and the unread preview in one round trip; each branch is a
+    # sorted, limited index scan rather than a pass over the whole history.
+    pipeline = [
+        {"$match": {"user_email": user_email}},
+        {"$sort": {"created_at": -1}},
+        {"$limit": 1},
+        {"$project": {"_id": 0, "created_at": 1, "latest": {"$literal": True}}},
+        {
+            "$unionWith": {
+                "coll": ALERT_EVENTS_COLLECTION.name,
+                "pipeline": [
+                    {"$match": unread_query},
+                    {"$sort": {"created_at": -1}},
+                    {"$limit": limit},
+                    {"$project": {"ticker": 1, "title": 1, "message": 1, "severity": 1, "created_at": 1}},
+                ],
+            }
+        },
+    ]
+    latest_event_at = None
+    preview_items = []
+    for doc in ALERT_EVENTS_COLLECTION.aggregate(pipeline):
+        if doc.get("latest"):
+            latest_event_at = _to_iso(doc.get("created_at"))
+        else:
+            preview_items.append(_serialize_summary_item(doc))
 
     return AlertSummaryOut(
         unread_count=unread_count,
@@ -877,14 +1023,14 @@ def mark_alert_event_read(
     event_id: str,
     user_email: str = Depends(_get_user_email),
 ) -> MessageResponse:
-    _ensure_indexes()
     try:
         object_id = ObjectId(event_id)
     except Exception as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid event id") from exc
 
+    # Filtering on is_read skips the write (and its journal/replication) for repeat reads.
     result = ALERT_EVENTS_COLLECTION.update_one(
-        {"_id": object_id, "user_email": user_email},
+        {"_id": object_id, "user_email": user_email, "is_read": False},
         {
             "$set": {
                 "is_read": True,
@@ -892,7 +1038,9 @@ def mark_alert_event_read(
             }
         },
     )
-    if result.matched_count == 0:
+    if result.matched_count == 0 and not ALERT_EVENTS_COLLECTION.count_documents(
+        {"_id": object_id, "user_email": user_email}, limit=1
+    ):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Alert event not found")
     return MessageResponse(message="Alert marked as read")
 
@@ -903,7 +1051,6 @@ def mark_all_alert_events_read(
     request: Request,
     user_email: str = Depends(_get_user_email),
 ) -> MessageResponse:
-    _ensure_indexes()
     result = ALERT_EVENTS_COLLECTION.update_many(
         {"user_email": user_email, "is_read": False},
         {
@@ -1,23 +1,33 @@
+import functools
+import re
+import sys
 from datetime import datetime, timezone
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Self
 from fastapi import APIRouter, HTTPException, Depends, status, Form, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, model_validator
+from pymongo import ReturnDocument, WriteConcern
+from pymongo.errors import DuplicateKeyError, PyMongoError
 from utils.limiter import limiter
 
-from database.database import user_db as db
+from database.database import async_user_db as db
 from models.users import User, UpdateUser, MessageResponse, TokenResponse, RefreshTokenRequest
 from services.auth_services import (
     hash_password,
     verify_password,
-    create_access_token,
+    create_access_token_cached,
     create_refresh_token,
+    new_refresh_token_id,
     decode_access_token,
     decode_refresh_token,
     decode_access_google_token,
     hash_refresh_token_id,
+    refresh_token_id_hashes,
+    is_password_verification_cached,
+    remember_password_verification,
 )
-from services.admin_access import is_admin_user
+from services.admin_access import EMAIL_COLLATION, is_admin_user
 
 auth_router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
@@ -26,6 +36,99 @@ MAX_WATCHLIST_ITEMS = 20
 MAX_RECENT_ITEMS = 12
 MAX_WATCHLIST_GROUPS = 8
 MAX_GROUP_NAME_LENGTH = 24
+# Bumped whenever normalization rules change. PUT /watchlist stores the three
+# watchlist fields already normalized and tags them with this version, so GET
+# can return them as-is; untagged (legacy) documents are normalized on read.
+WATCHLIST_CANON_VERSION = 1
+_TICKER_FULLMATCH = re.compile(r"[A-Z0-9.\-]{1,8}").fullmatch
+_WHITESPACE_RUN_RE = re.compile(r"\s+")
+# \w keeps Unicode letters/digits (as str.isalnum did) plus "_".
+_GROUP_NAME_DISALLOWED_RE = re.compile(r"[^\w \-&]")
+
+# Token issuance reads only credentials plus what is_admin_user needs.
+LOGIN_PROJECTION = {"_id": 0, "email": 1, "hashed_password": 1, "login_type": 1, "role": 1, "is_admin": 1}
+# /me/update only checks the current password; email keeps the result non-empty.
+UPDATE_USER_PROJECTION = {"_id": 0, "email": 1, "hashed_password": 1, "login_type": 1}
+
+# /me returns profile fields only (plus what is_admin_user reads); refresh-token
+# hashes and watchlists stay out of the response.
+ME_PROJECTION = {
+    "_id": 0,
+    "email": 1,
+    "name": 1,
+    "first_name": 1,
+    "last_name": 1,
+    "family_name": 1,
+    "login_type": 1,
+    "created_at": 1,
+    "role": 1,
+    "is_admin": 1,
+}
+
+
+# Clients re-send the same watchlist on every GET/PUT, so normalization is
+# memoized on the (hashable) tuple of raw values.
+@functools.lru_cache(maxsize=4096)
+def _normalize_ticker_tuple(values: tuple[Any, ...], max_items: int) -> tuple[str, ...]:
+    # dict.fromkeys dedups while keeping first-seen order. Interning makes the
+    # group-vs-watchlist membership checks hit the identity fast path.
+    tickers = (str(value or "").upper().strip() for value in values)
+    return tuple(dict.fromkeys(sys.intern(ticker) for ticker in tickers if _TICKER_FULLMATCH(ticker)))[:max_items]
+
+
+def _normalize_tickers(values: list[Any], max_items: int) -> list[str]:
+    try:
+        return list(_normalize_ticker_tuple(tuple(values), max_items))
+    except TypeError:
+        # Unhashable entries (malformed stored data) skip the cache.
+        return list(_normalize_ticker_tuple.__wrapped__(tuple(values), max_items))
+
+
+def _normalize_group_name(value: str) -> str:
+    compact = _WHITESPACE_RUN_RE.sub(" ", str(value or "").strip())
+    return _GROUP_NAME_DISALLOWED_RE.sub("", compact).strip()[:MAX_GROUP_NAME_LENGTH]
+
+
+def _normalize_groups(
+    groups: Dict[str, list[str]] | None,
+    allowed: frozenset[str] | None = None,
+) -> Dict[str, list[str]]:
+    """
+    Clean group names and tickers. A non-empty `allowed` set (already-normalized
+    watchlist tickers) both validates and filters, so group tickers only need
+    upper-casing and a membership test instead of a full _normalize_tickers pass.
+    """
+    if not isinstance(groups, dict):
+        return {}
+
+    normalized: Dict[str, list[str]] = {}
+    seen_names: set[str] = set()
+
+    for raw_name, raw_tickers in groups.items():
+        name = _normalize_group_name(raw_name)
+        if not name:
+            continue
+
+        lowered = name.lower()
+        if lowered in seen_names:
+            continue
+
+        if not isinstance(raw_tickers, list):
+            continue
+        if allowed:
+            candidates = (str(value or "").upper().strip() for value in raw_tickers)
+            tickers = list(dict.fromkeys(ticker for ticker in candidates if ticker in allowed))[:MAX_WATCHLIST_ITEMS]
+        else:
+            tickers = _normalize_tickers(raw_tickers, MAX_WATCHLIST_ITEMS)
+        if not tickers:
+            continue
+
+        normalized[name] = tickers
+        seen_names.add(lowered)
+        if len(normalized) >= MAX_WATCHLIST_GROUPS:
+            break
+
+    return normalized
 
 
 class WatchlistUpdateRequest(BaseModel):
@@ -33,81 +136,15 @@ class WatchlistUpdateRequest(BaseModel):
     recent_tickers: list[str] = Field(default_factory=list, max_length=MAX_RECENT_ITEMS)
     watchlist_groups: Dict[str, list[str]] | None = None
 
-    @staticmethod
-    def _normalize_tickers(values: list[str], max_items: int) -> list[str]:
-        normalized: list[str] = []
-        seen: set[str] = set()
-        for value in values:
-            ticker = str(value or "").upper().strip()
-            if not ticker or ticker in seen:
-                continue
-            if len(ticker) > 8:
-                continue
-            if not all(ch.isalnum() or ch in ".-" for ch in ticker):
-                continue
-            seen.add(ticker)
-            normalized.append(ticker)
-        return normalized[:max_items]
-
-    @staticmethod
-    def _normalize_group_name(value: str) -> str:
-        compact = " ".join(str(value or "").strip().split())
-        cleaned = "".join(ch for ch in compact if ch.isalnum() or ch in " -&_")
-        return cleaned.strip()[:MAX_GROUP_NAME_LENGTH]
-
-    @classmethod
-    def _normalize_groups(
-        cls,
-        groups: Dict[str, list[str]] | None,
-        allowed_tickers: list[str] | None = None,
-    ) -> Dict[str, list[str]]:
-        if not isinstance(groups, dict):
-            return {}
-
-        allowed = set(allowed_tickers or [])
-        normalized: Dict[str, list[str]] = {}
-        seen_names: set[str] = set()
-
-        for raw_name, raw_tickers in groups.items():
-            name = cls._normalize_group_name(raw_name)
-            if not name:
-                continue
-
-            lowered = name.lower()
-            if lowered in seen_names:
-                continue
-
-            if not isinstance(raw_tickers, list):
-                continue
-            tickers = cls._normalize_tickers(raw_tickers or [], MAX_WATCHLIST_ITEMS)
-            if allowed:
-                tickers = [ticker for ticker in tickers if ticker in allowed]
-            if not tickers:
-                continue
-
-            normalized[name] = tickers
-            seen_names.add(lowered)
-            if len(normalized) >= MAX_WATCHLIST_GROUPS:
-                break
-
-        return normalized
-
-    @field_validator("watchlist")
-    @classmethod
-    def validate_watchlist(cls, value: list[str]) -> list[str]:
-        return cls._normalize_tickers(value, MAX_WATCHLIST_ITEMS)
-
-    @field_validator("recent_tickers")
-    @classmethod
-    def validate_recent(cls, value: list[str]) -> list[str]:
-        return cls._normalize_tickers(value, MAX_RECENT_ITEMS)
-
-    @field_validator("watchlist_groups")
-    @classmethod
-    def validate_groups(cls, value: Dict[str, list[str]] | None) -> Dict[str, list[str]] | None:
-        if value is None:
-            return None
-        return cls._normalize_groups(value)
+    @model_validator(mode="after")
+    def _normalize(self) -> Self:
+        # One pass over all three fields; groups are filtered against the
+        # already-normalized watchlist so the handler need not redo it.
+        self.watchlist = _normalize_tickers(self.watchlist, MAX_WATCHLIST_ITEMS)
+        self.recent_tickers = _normalize_tickers(self.recent_tickers, MAX_RECENT_ITEMS)
+        if self.watchlist_groups is not None:
+            self.watchlist_groups = _normalize_groups(self.watchlist_groups, frozenset(self.watchlist))
+        return self
 
 
 class WatchlistResponse(BaseModel):
@@ -117,23 +154,68 @@ class WatchlistResponse(BaseModel):
     updated_at: str
 
 
-def _persist_refresh_token(email: str, refresh_token_id: str, refresh_expires_at: datetime) -> None:
-    db.users.update_one(
+@functools.cache
+def _session_users():
+    """
+    users collection for refresh-token session writes, acknowledged without
+    waiting on the journal. Losing one on a crash only forces a re-login.
+    """
+    return db.users.with_options(write_concern=WriteConcern(w=1, j=False))
+
+
+async def _persist_refresh_token(
+    email: str,
+    refresh_token_id: str,
+    refresh_expires_at: datetime,
+    now: datetime,
+) -> None:
+    await _session_users().update_one(
         {"email": email},
         {
             "$set": {
                 "refresh_token_jti_hash": hash_refresh_token_id(refresh_token_id),
                 "refresh_token_expires_at": refresh_expires_at,
-                "updated_at": datetime.now(timezone.utc),
+                "updated_at": now,
             }
         },
     )
 
 
-def _issue_tokens_for_user(user: Dict[str, Any]) -> TokenResponse:
-    access_token = create_access_token(data={"sub": user["email"]})
+_LOGIN_USER_NOT_FOUND = "User not found. Please sign up to access our services."
+_LOGIN_GOOGLE_ONLY = (
+    "This account uses Google login. Please sign in with Google or set a password in Account Settings."
+)
+_LOGIN_INCORRECT_PASSWORD = "Incorrect password."
+
+
+def _password_login_error(user: Dict[str, Any] | None, password: Optional[str]) -> str | None:
+    """401 detail for the checks that don't need bcrypt, or None to go on and verify."""
+    if not user:
+        return _LOGIN_USER_NOT_FOUND
+    if not user.get("hashed_password"):
+        return _LOGIN_GOOGLE_ONLY
+    if not password:
+        return _LOGIN_INCORRECT_PASSWORD
+    return None
+
+
+async def _verify_login_password(email: str, password: str, hashed_password: str) -> bool:
+    if is_password_verification_cached(email, password, hashed_password):
+        return True
+    if not await run_in_threadpool(verify_password, password, hashed_password):
+        return False
+    remember_password_verification(email, password, hashed_password)
+    return True
+
+
+async def _issue_tokens_for_user(user: Dict[str, Any], now: datetime) -> TokenResponse:
+    access_token = create_access_token_cached(user["email"])
     refresh_token, refresh_token_id, refresh_expires_at = create_refresh_token(data={"sub": user["email"]})
-    _persist_refresh_token(user["email"], refresh_token_id, refresh_expires_at)
+    await _persist_refresh_token(user["email"], refresh_token_id, refresh_expires_at, now)
+    return _token_response(user, access_token, refresh_token)
+
+
+def _token_response(user: Dict[str, Any], access_token: str, refresh_token: str) -> TokenResponse:
     return TokenResponse(
         access_token=access_token,
         refresh_token=refresh_token,
@@ -147,15 +229,8 @@ def _issue_tokens_for_user(user: Dict[str, Any]) -> TokenResponse:
 @auth_router.post("/signup", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
 @limiter.limit("3/minute")
 async def signup(request: Request, user: User) -> MessageResponse:
-    """Register a new user."""
-    user_exists = db.users.find_one({"email": user.email})
-    if user_exists:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Email already exists"
-        )
-
-    hashed_password = hash_password(user.password)
+    """Register a new user. The unique email index rejects duplicates atomically."""
+    hashed_password = await run_in_threadpool(hash_password, user.password)
     name_parts = user.name.strip().split(" ", 1)
     new_user = {
         "name": user.name,
@@ -166,7 +241,13 @@ async def signup(request: Request, user: User) -> MessageResponse:
         "first_name": name_parts[0],
         "family_name": name_parts[1] if len(name_parts) > 1 else ""
     }
-    db.users.insert_one(new_user)
+    try:
+        await db.users.insert_one(new_user)
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Email already exists"
+        )
     return MessageResponse(message="User created successfully")
 
 
@@ -182,24 +263,15 @@ async def login(
     """Authenticate user and return access token."""
     
     user = None
+    now = datetime.now(timezone.utc)
 
     if login_type == "normal":
-        user = db.users.find_one({"email": username})
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found. Please sign up to access our services."
-            )
-        if not user.get("hashed_password"):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="This account uses Google login. Please sign in with Google or set a password in Account Settings."
-            )
-        if not password or not verify_password(password, user["hashed_password"]):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Incorrect password."
-            )
+        user = await db.users.find_one({"email": username}, LOGIN_PROJECTION)
+        error = _password_login_error(user, password)
+        if error is None and not await _verify_login_password(user["email"], password, user["hashed_password"]):
+            error = _LOGIN_INCORRECT_PASSWORD
+        if error is not None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=error)
 
     elif login_type == "google":
         if not token:
@@ -208,7 +280,7 @@ async def login(
                 detail="Google token is required for Google login."
             )
 
-        decoded_token = decode_access_google_token(token)
+        decoded_token = await run_in_threadpool(decode_access_google_token, token)
         if not decoded_token:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -222,34 +294,48 @@ async def login(
                 detail="Google token is missing email information."
             )
 
-        # Secure Lookup: Find user by the VERIFIED email from Google, not the form username
-        user = db.users.find_one({"email": email})
-
+        # Secure Lookup: key on the VERIFIED email from Google, not the form username.
+        # One upsert both finds an existing user and creates a first-time one.
+        new_user = {
+            "first_name": decoded_token.get("given_name", ""),
+            "last_name": decoded_token.get("family_name", ""),
+            "name": decoded_token.get("given_name", "") + " " + decoded_token.get("family_name", ""),
+            "email": email,
+            "hashed_password": None,
+            "created_at": now,
+            "login_type": "google"
+        }
+        # EMAIL_COLLATION matches the unique idx_email_ci index, so a case variant
+        # of a stored address resolves to that user instead of colliding with it.
+        try:
+            user = await db.users.find_one_and_update(
+                {"email": email},
+                {"$setOnInsert": new_user},
+                projection=LOGIN_PROJECTION,
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+                collation=EMAIL_COLLATION,
+            )
+        except DuplicateKeyError:
+            # A concurrent first login won the upsert race; the user exists now.
+            user = await db.users.find_one({"email": email}, LOGIN_PROJECTION, collation=EMAIL_COLLATION)
+        except PyMongoError:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to create new user for Google login."
+            )
         if not user:
-            new_user = {
-                "first_name": decoded_token.get("given_name", ""),
-                "last_name": decoded_token.get("family_name", ""),
-                "name": decoded_token.get("given_name", "") + " " + decoded_token.get("family_name", ""),
-                "email": email,
-                "hashed_password": None,
-                "created_at": datetime.now(timezone.utc),
-                "login_type": "google"
-            }
-            try:
-                db.users.insert_one(new_user)
-                user = new_user
-            except Exception:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Failed to create new user for Google login."
-                )
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Could not resolve an account for this Google email. Please try again."
+            )
     else:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid login type."
         )
 
-    return _issue_tokens_for_user(user)
+    return await _issue_tokens_for_user(user, now)
 
 
 @auth_router.post("/refresh", response_model=TokenResponse)
@@ -265,22 +351,37 @@ async def refresh_access_token(request: Request, payload: RefreshTokenRequest) -
     if not email or not token_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token payload")
 
-    user = db.users.find_one({"email": email})
+    # Rotate atomically: the filter only matches while the presented token is
+    # still the stored, unexpired one, so a replayed refresh token gets None.
+    # Only the new jti is needed for the write; both tokens are signed after it
+    # succeeds, so replayed/revoked tokens cost no signing and never populate
+    # the issued access-token cache.
+    refresh_token_id, refresh_expires_at = new_refresh_token_id()
+    now = datetime.now(timezone.utc)
+    user = await _session_users().find_one_and_update(
+        {
+            "email": email,
+            "refresh_token_jti_hash": {"$in": refresh_token_id_hashes(token_id)},
+            "refresh_token_expires_at": {"$gt": now},
+        },
+        {
+            "$set": {
+                "refresh_token_jti_hash": hash_refresh_token_id(refresh_token_id),
+                "refresh_token_expires_at": refresh_expires_at,
+                "updated_at": now,
+            }
+        },
+        projection=LOGIN_PROJECTION,
+        return_document=ReturnDocument.AFTER,
+    )
     if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-
-    stored_hash = user.get("refresh_token_jti_hash")
-    stored_exp = user.get("refresh_token_expires_at")
-    if not stored_hash or not stored_exp or hash_refresh_token_id(token_id) != stored_hash:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token has been revoked")
-
-    if stored_exp and isinstance(stored_exp, datetime):
-        if stored_exp.tzinfo is None:
-            stored_exp = stored_exp.replace(tzinfo=timezone.utc)
-        if stored_exp < datetime.now(timezone.utc):
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token has expired")
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token has been revoked or expired")
 
-    return _issue_tokens_for_user(user)
+    access_token = create_access_token_cached(email)
+    refresh_token, _, _ = create_refresh_token(
+        data={"sub": email}, token_id=refresh_token_id, expire=refresh_expires_at
+    )
+    return _token_response(user, access_token, refresh_token)
 
 
 @auth_router.post("/logout", response_model=MessageResponse)
@@ -293,7 +394,7 @@ async def logout(request: Request, token: str = Depends(oauth2_scheme)) -> Messa
 
     email = payload.get("sub")
     if email:
-        db.users.update_one(
+        await _session_users().update_one(
             {"email": email},
             {"$unset": {"refresh_token_jti_hash": "", "refresh_token_expires_at": ""}},
         )
@@ -308,11 +409,10 @@ async def get_current_user(request: Request, token: str = Depends(oauth2_scheme)
     if not payload:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
-    user = db.users.find_one({"email": payload.get("sub")}, {"hashed_password": 0})
+    user = await db.users.find_one({"email": payload.get("sub")}, ME_PROJECTION)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
 
-    user.pop("_id", None)
     user["is_admin"] = is_admin_user(user)
     return user
 
@@ -326,7 +426,7 @@ async def update_user_info(request: Request, update_info: UpdateUser, token: str
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
     user_email = payload.get("sub")
-    user = db.users.find_one({"email": user_email})
+    user = await db.users.find_one({"email": user_email}, UPDATE_USER_PROJECTION)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
@@ -341,21 +441,42 @@ async def update_user_info(request: Request, update_info: UpdateUser, token: str
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Current password is required to change password."
                 )
-            if not verify_password(update_info.current_password, user["hashed_password"]):
+            if not await run_in_threadpool(verify_password, update_info.current_password, user["hashed_password"]):
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Current password is incorrect."
                 )
-        update_data["hashed_password"] = hash_password(update_info.password)
+        update_data["hashed_password"] = await run_in_threadpool(hash_password, update_info.password)
         if user.get("login_type") == "google":
             update_data["login_type"] = "both"
 
     if update_data:
-        db.users.update_one({"email": user_email}, {"$set": update_data})
+        await db.users.update_one({"email": user_email}, {"$set": update_data})
 
     return MessageResponse(message="User information updated successfully")
 
 
+# Projection shared by GET and PUT /watchlist; email keeps the result non-empty
+# for users who never saved a watchlist.
+WATCHLIST_PROJECTION = {
+    "_id": 0,
+    "email": 1,
+    "watchlist": 1,
+    "recent_tickers": 1,
+    "watchlist_groups": 1,
+    "watchlist_updated_at": 1,
+    "watchlist_canon_v": 1,
+}
+
+
+def _watchlist_updated_at(value: Any) -> str:
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat()
+    return datetime.now(timezone.utc).isoformat()
+
+
 @auth_router.get("/watchlist", response_model=WatchlistResponse)
 @limiter.limit("120/minute")
 async def get_watchlist(request: Request, token: str = Depends(oauth2_scheme)) -> WatchlistResponse:
@@ -364,29 +485,24 @@ async def get_watchlist(request: Request, token: str = Depends(oauth2_scheme)) -
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
     user_email = payload.get("sub")
-    user = db.users.find_one(
-        {"email": user_email},
-        {"_id": 0, "watchlist": 1, "recent_tickers": 1, "watchlist_groups": 1, "watchlist_updated_at": 1},
-    )
+    user = await db.users.find_one({"email": user_email}, WATCHLIST_PROJECTION)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
-    watchlist = WatchlistUpdateRequest._normalize_tickers(user.get("watchlist") or [], MAX_WATCHLIST_ITEMS)
-    recent_tickers = WatchlistUpdateRequest._normalize_tickers(user.get("recent_tickers") or [], MAX_RECENT_ITEMS)
-    watchlist_groups = WatchlistUpdateRequest._normalize_groups(user.get("watchlist_groups") or {}, watchlist)
-    updated_at_raw = user.get("watchlist_updated_at")
-    if isinstance(updated_at_raw, datetime):
-        if updated_at_raw.tzinfo is None:
-            updated_at_raw = updated_at_raw.replace(tzinfo=timezone.utc)
-        updated_at = updated_at_raw.isoformat()
+    if user.get("watchlist_canon_v") == WATCHLIST_CANON_VERSION:
+        watchlist = user.get("watchlist") or []
+        recent_tickers = user.get("recent_tickers") or []
+        watchlist_groups = user.get("watchlist_groups") or {}
     else:
-        updated_at = datetime.now(timezone.utc).isoformat()
+        watchlist = _normalize_tickers(user.get("watchlist") or [], MAX_WATCHLIST_ITEMS)
+        recent_tickers = _normalize_tickers(user.get("recent_tickers") or [], MAX_RECENT_ITEMS)
+        watchlist_groups = _normalize_groups(user.get("watchlist_groups") or {}, frozenset(watchlist))
 
     return WatchlistResponse(
         watchlist=watchlist,
         recent_tickers=recent_tickers,
         watchlist_groups=watchlist_groups,
-        updated_at=updated_at,
+        updated_at=_watchlist_updated_at(user.get("watchlist_updated_at")),
     )
 
 
@@ -402,29 +518,43 @@ async def update_watchlist(
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
     user_email = payload.get("sub")
-    user = db.users.find_one({"email": user_email}, {"_id": 1, "watchlist_groups": 1})
+    user = await db.users.find_one({"email": user_email}, WATCHLIST_PROJECTION)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
     if watchlist_update.watchlist_groups is None:
-        watchlist_groups = WatchlistUpdateRequest._normalize_groups(
+        watchlist_groups = _normalize_groups(
             user.get("watchlist_groups") or {},
-            watchlist_update.watchlist,
+            frozenset(watchlist_update.watchlist),
         )
     else:
-        watchlist_groups = WatchlistUpdateRequest._normalize_groups(
-            watchlist_update.watchlist_groups,
-            watchlist_update.watchlist,
+        watchlist_groups = watchlist_update.watchlist_groups
+
+    # Auto-saving clients often PUT what is already stored; skip the write then.
+    # Groups compare as item lists so a reorder still counts as a change.
+    if (
+        user.get("watchlist_canon_v") == WATCHLIST_CANON_VERSION
+        and isinstance(user.get("watchlist_updated_at"), datetime)
+        and user.get("watchlist") == watchlist_update.watchlist
+        and user.get("recent_tickers") == watchlist_update.recent_tickers
+        and list((user.get("watchlist_groups") or {}).items()) == list(watchlist_groups.items())
+    ):
+        return WatchlistResponse(
+            watchlist=watchlist_update.watchlist,
+            recent_tickers=watchlist_update.recent_tickers,
+            watchlist_groups=watchlist_groups,
+            updated_at=_watchlist_updated_at(user["watchlist_updated_at"]),
         )
 
     now = datetime.now(timezone.utc)
-    db.users.update_one(
+    await db.users.update_one(
         {"email": user_email},
         {
             "$set": {
                 "watchlist": watchlist_update.watchlist,
                 "recent_tickers": watchlist_update.recent_tickers,
                 "watchlist_groups": watchlist_groups,
+                "watchlist_canon_v": WATCHLIST_CANON_VERSION,
                 "watchlist_updated_at": now,
                 "updated_at": now,
             }
@@ -1,9 +1,13 @@
 from fastapi import APIRouter, HTTPException, Depends, Request
 from fastapi.security import OAuth2PasswordBearer
 from fastapi.concurrency import run_in_threadpool
+import asyncio
+import functools
+import os
 from typing import List, Optional
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from starlette import status
 from datetime import timedelta, datetime
 from services.auth_services import decode_access_token
@@ -16,6 +20,13 @@ from utils.limiter import limiter
 forecast_router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
+# Prophet's Stan fit is CPU-bound: run it off the event loop, at most this many at once.
+try:
+    FORECAST_CONCURRENCY = max(1, int(os.getenv("FORECAST_CONCURRENCY", str(os.cpu_count() or 2)).strip() or "2"))
+except ValueError:
+    FORECAST_CONCURRENCY = os.cpu_count() or 2
+_FORECAST_SEMAPHORE = asyncio.Semaphore(FORECAST_CONCURRENCY)
+
 
 def get_current_user(token: str = Depends(oauth2_scheme)):
     user = decode_access_token(token)
@@ -28,15 +39,68 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
     return user
 
 
+@functools.cache
+def _prophet_class():
+    """
+    Import Prophet once per process. A failed import is cached too, so hosts
+    without Prophet don't repeat the module search on every request.
+    """
+    try:
+        from prophet import Prophet
+    except Exception as e:
+        logging.warning("Prophet unavailable, forecasts will use the fallback: %s", e)
+        return None
+    return Prophet
+
+
 def compute_rsi(series: pd.Series, window: int) -> pd.Series:
-    """Compute Relative Strength Index (RSI)."""
-    delta = series.diff()
-    up = delta.clip(lower=0)
-    down = -1 * delta.clip(upper=0)
-    roll_up = up.rolling(window).mean()
-    roll_down = down.rolling(window).mean()
-    rs = roll_up / roll_down
-    return 100 - (100 / (1 + rs))
+    """Compute Relative Strength Index (RSI) on the raw array, without pandas temporaries."""
+    values = series.to_numpy(dtype=np.float64)
+    rsi = np.full(values.shape, np.nan)
+    if len(values) > window:
+        delta = np.diff(values)
+        roll_up = sliding_window_view(np.maximum(delta, 0.0), window).mean(axis=1)
+        roll_down = sliding_window_view(np.maximum(-delta, 0.0), window).mean(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi[window:] = 100 - (100 / (1 + roll_up / roll_down))
+    return pd.Series(rsi, index=series.index)
+
+
+def _ema_adjust_false(values: List[float], span: float) -> List[float]:
+    """
+    Series.ewm(span=span, adjust=False).mean() for a gap-free series, as a
+    plain loop. The forecast series are a few hundred points long, where
+    pandas' per-call setup costs more than the recursion itself.
+    """
+    alpha = 2.0 / (span + 1.0)
+    old_wt = 1.0 - alpha
+    weighted = values[0]
+    out = [weighted]
+    for cur in values[1:]:
+        if weighted != cur:
+            weighted = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+        out.append(weighted)
+    return out
+
+
+def _ema_last_and_drift(values: List[float], span: float, lookback: int = 5) -> tuple[float, float]:
+    """
+    Last value of _ema_adjust_false(values, span) and its mean daily change over
+    the final ``lookback`` steps, without materialising the EMA series.
+    """
+    alpha = 2.0 / (span + 1.0)
+    old_wt = 1.0 - alpha
+    lookback = min(lookback, len(values) - 1)
+    anchor_idx = len(values) - 1 - lookback
+    weighted = anchor = values[0]
+    for idx in range(1, len(values)):
+        cur = values[idx]
+        if weighted != cur:
+            weighted = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+        if idx == anchor_idx:
+            anchor = weighted
+    drift = (weighted - anchor) / lookback if lookback > 0 else 0.0
+    return weighted, drift
 
 
 def build_insider_signal(ticker: str, date_range: pd.DatetimeIndex) -> pd.Series:
@@ -45,55 +109,71 @@ def build_insider_signal(ticker: str, date_range: pd.DatetimeIndex) -> pd.Series
     Purchases = +1, Sales = -1, weighted by share volume and normalized.
     Returns a Series indexed by date with the insider signal value.
     """
-    signal = pd.Series(0.0, index=date_range, name="insider_signal")
+    values = np.zeros(len(date_range))
 
     try:
         transactions = get_all_transactions(ticker, "1y")
-        if not transactions:
-            return signal
+        if not transactions or not len(date_range):
+            return pd.Series(values, index=date_range, name="insider_signal")
 
+        txn_dates: list[Optional[str]] = []
+        signed_shares: list[float] = []
         for txn in transactions:
+            code = (txn.transaction_code or "").upper()
+            if code != "P" and code != "S":
+                continue
             try:
-                txn_date = pd.Timestamp(txn.transaction_date)
-                if txn_date not in date_range:
-                    # Find nearest date in range
-                    diffs = abs(date_range - txn_date)
-                    nearest_idx = diffs.argmin()
-                    txn_date = date_range[nearest_idx]
-
                 shares = float(txn.shares or 0)
-                code = (txn.transaction_code or "").upper()
-
-                if code == "P":  # Purchase
-                    signal.loc[txn_date] += shares
-                elif code == "S":  # Sale
-                    signal.loc[txn_date] -= shares
-            except Exception:
+            except (TypeError, ValueError):
                 continue
+            txn_dates.append(txn.transaction_date)
+            signed_shares.append(shares if code == "P" else -shares)
+
+        try:
+            stamps = pd.DatetimeIndex(pd.to_datetime(txn_dates, format="ISO8601"))
+        except (ValueError, TypeError):
+            stamps = pd.DatetimeIndex(pd.to_datetime(txn_dates, format="mixed", errors="coerce"))
+        if stamps.tz is None and date_range.tz is not None:
+            stamps = stamps.tz_localize(date_range.tz)
+        elif stamps.tz is not None and date_range.tz is None:
+            stamps = stamps.tz_localize(None)
+        valid = ~stamps.isna()
+
+        # Snap each transaction to the nearest trading day (earlier day on ties).
+        # date_range is sorted, so the candidates are the insertion point and the day before it.
+        range_ns = date_range.asi8
+        txn_ns = stamps.asi8[valid]
+        right = np.clip(np.searchsorted(range_ns, txn_ns), 0, len(range_ns) - 1)
+        left = np.maximum(right - 1, 0)
+        nearest = np.where(np.abs(range_ns[left] - txn_ns) <= np.abs(range_ns[right] - txn_ns), left, right)
+        np.add.at(values, nearest, np.asarray(signed_shares, dtype=np.float64)[valid])
 
         # Normalize to [-1, 1] range for use as a regressor
-        max_abs = signal.abs().max()
+        max_abs = np.abs(values).max()
         if max_abs > 0:
-            signal = signal / max_abs
+            values = values / max_abs
 
     except Exception as e:
         logging.warning("Failed to build insider signal for %s: %s", ticker, e)
 
-    return signal
+    return pd.Series(values, index=date_range, name="insider_signal")
 
 
 def prepare_training_data(data: List[ForecastInput], ticker: Optional[str] = None) -> pd.DataFrame:
     """Prepare and clean training data for Prophet with optional insider signal."""
-    df = pd.DataFrame([
-        {
-            "ds": parse(item.date),
-            "y": item.open,
-            "high": item.high,
-            "low": item.low,
-            "close": item.close
-        }
-        for item in data
-    ])
+    # Column-wise construction: one C-level ISO8601 parse instead of dateutil per row.
+    dates = [item.date for item in data]
+    try:
+        ds = pd.to_datetime(dates, format="ISO8601", cache=True)
+    except (ValueError, TypeError):
+        ds = pd.to_datetime([parse(value) for value in dates])
+    df = pd.DataFrame({
+        "ds": ds,
+        "y": np.array([item.open for item in data], dtype=np.float64),
+        "high": np.array([item.high for item in data], dtype=np.float64),
+        "low": np.array([item.low for item in data], dtype=np.float64),
+        "close": np.array([item.close for item in data], dtype=np.float64),
+    })
     df = df.sort_values('ds')
 
     # Use all available data instead of truncating to 90 days
@@ -103,7 +183,10 @@ def prepare_training_data(data: List[ForecastInput], ticker: Optional[str] = Non
     df['volatility'] = df['y'].rolling(window=5).std()
     df['returns'] = df['y'].pct_change()
     df['rolling_mean'] = df['y'].rolling(window=5).mean()
-    df['ema'] = df['y'].ewm(span=3, adjust=False).mean()
+    if df['y'].hasnans:
+        df['ema'] = df['y'].ewm(span=3, adjust=False).mean()
+    else:
+        df['ema'] = _ema_adjust_false(df['y'].tolist(), span=3)
     df['rsi'] = compute_rsi(df['y'], window=3)
     for lag in range(1, 4):
         df[f'lag_{lag}'] = df['y'].shift(lag)
@@ -113,7 +196,11 @@ def prepare_training_data(data: List[ForecastInput], ticker: Optional[str] = Non
         insider = build_insider_signal(ticker, pd.DatetimeIndex(df['ds']))
         df['insider_signal'] = insider.values
 
-    df = df.ffill().bfill()
+    # Fill only the columns that have gaps (indicator warm-up rows, missing prices);
+    # ds and complete price columns are left as they are.
+    gappy = df.columns[df.isna().to_numpy().any(axis=0)]
+    if len(gappy):
+        df[gappy] = df[gappy].ffill().bfill()
 
     return df
 
@@ -141,16 +228,9 @@ def fallback_forecast(df: pd.DataFrame, periods: int = 30) -> List[ForecastOutpu
     last_date = df["ds"].iloc[-1]
     last_val = float(y[-1])
 
-    # Calculate trend using EWM
-    ewm_series = pd.Series(y).ewm(span=min(10, len(y)), adjust=False).mean()
-    ewm_last = float(ewm_series.iloc[-1])
-
-    # Daily drift from EWM trend
-    if len(ewm_series) >= 2:
-        recent_drifts = ewm_series.diff().tail(5)
-        daily_drift = float(recent_drifts.mean())
-    else:
-        daily_drift = 0.0
+    # Trend from the EWM's last value; daily drift is the mean of its last
+    # five day-over-day changes, which telescopes to one difference.
+    ewm_last, daily_drift = _ema_last_and_drift(y.tolist(), span=min(10, len(y)))
 
     # Volatility for confidence bands
     std = float(np.nanstd(y[-min(20, len(y)):]))  # Recent volatility
@@ -163,34 +243,38 @@ def fallback_forecast(df: pd.DataFrame, periods: int = 30) -> List[ForecastOutpu
     # Get insider signal if available
     insider_val = float(df.get('insider_signal', pd.Series([0.0])).iloc[-1])
 
-    output = []
-    prev_trend = ewm_last
-    prev_momentum = daily_drift
-
-    for i in range(1, periods + 1):
-        decayed_drift = daily_drift * (decay_rate ** i)
-        trend_val = ewm_last + decayed_drift * i
-        band = std * np.sqrt(i / periods) * 1.5  # Widening confidence band
-
-        momentum = decayed_drift
-        acceleration = momentum - prev_momentum
+    # Whole-horizon arithmetic in numpy; only the rounding/model build is per row.
+    steps = np.arange(1, periods + 1)
+    momentum = daily_drift * decay_rate ** steps
+    trend = ewm_last + momentum * steps
+    band = std * np.sqrt(steps / periods) * 1.5  # Widening confidence band
+    acceleration = np.diff(momentum, prepend=daily_drift)
+    upper = trend + band
+    lower = np.maximum(0.01, trend - band)
+    dates = (last_date + pd.to_timedelta(steps, unit="D")).strftime("%Y-%m-%d")
+    insider_val = round(insider_val, 4)
 
+    output = []
+    for date, trend_val, high, low, mom, acc in zip(
+        dates, trend.tolist(), upper.tolist(), lower.tolist(),
+        momentum.tolist(), acceleration.tolist(),
+    ):
+        trend_val, high, low = round(trend_val, 2), round(high, 2), round(low, 2)
         output.append(ForecastOutput(
-            date=(last_date + timedelta(days=i)).strftime("%Y-%m-%d"),
-            open=round(trend_val, 2),
-            high=round(trend_val + band, 2),
-            low=round(max(0.01, trend_val - band), 2),
+            date=date,
+            open=trend_val,
+            high=high,
+            low=low,
             close=None,
-            trend=round(trend_val, 2),
-            trend_lower=round(max(0.01, trend_val - band), 2),
-            trend_upper=round(trend_val + band, 2),
-            yhat_lower=round(max(0.01, trend_val - band), 2),
-            yhat_upper=round(trend_val + band, 2),
-            momentum=round(momentum, 4),
-            acceleration=round(acceleration, 6),
-            insider_signal=round(insider_val, 4),
+            trend=trend_val,
+            trend_lower=low,
+            trend_upper=high,
+            yhat_lower=low,
+            yhat_upper=high,
+            momentum=round(mom, 4),
+            acceleration=round(acc, 6),
+            insider_signal=insider_val,
         ))
-        prev_momentum = momentum
 
     return output
 
@@ -222,15 +306,19 @@ async def generate_forecast(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Need at least 2 data points for forecasting.",
         )
-    y = df["y"]
-    if np.any(np.isnan(y)) or np.any(np.isinf(y)):
+    # One pass over y: after the ffill/bfill in prepare_training_data only an
+    # all-NaN series or an infinite price can be left here.
+    if not np.isfinite(df["y"].to_numpy()).all():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid values (NaN or Inf) in price data.",
         )
 
+    Prophet = _prophet_class()
+    if Prophet is None:
+        return fallback_forecast(df, periods=30)
+
     try:
-        from prophet import Prophet
         model = Prophet(
             growth="linear",
             yearly_seasonality=False,
@@ -250,7 +338,8 @@ async def generate_forecast(
                 model.add_regressor(reg)
 
         train_cols = ["ds", "y"] + [r for r in regressors if r in df.columns]
-        model.fit(df[train_cols])
+        async with _FORECAST_SEMAPHORE:
+            await run_in_threadpool(model.fit, df[train_cols])
 
         future = model.make_future_dataframe(periods=30, freq="D", include_history=False)
 
@@ -260,7 +349,8 @@ async def generate_forecast(
                 last_val = float(df[reg].iloc[-1])
                 future[reg] = last_val  # Use last known value as forward fill
 
-        forecast = model.predict(future)
+        async with _FORECAST_SEMAPHORE:
+            forecast = await run_in_threadpool(model.predict, future)
 
         result = forecast[["ds", "yhat", "yhat_lower", "yhat_upper", "trend", "trend_lower", "trend_upper"]].copy()
         result.loc[:, "momentum"] = np.gradient(result["trend"])
@@ -269,23 +359,36 @@ async def generate_forecast(
         # Get insider signal value for context
         insider_val = float(df['insider_signal'].iloc[-1]) if 'insider_signal' in df.columns else 0.0
 
+        # Pull each column out once as plain Python values instead of building a Series per row.
+        columns = zip(
+            result["ds"].dt.strftime("%Y-%m-%d").tolist(),
+            result["yhat"].to_numpy(dtype=np.float64).tolist(),
+            result["yhat_lower"].to_numpy(dtype=np.float64).tolist(),
+            result["yhat_upper"].to_numpy(dtype=np.float64).tolist(),
+            result["trend"].to_numpy(dtype=np.float64).tolist(),
+            result["trend_lower"].to_numpy(dtype=np.float64).tolist(),
+            result["trend_upper"].to_numpy(dtype=np.float64).tolist(),
+            result["momentum"].to_numpy(dtype=np.float64).tolist(),
+            result["acceleration"].to_numpy(dtype=np.float64).tolist(),
+        )
+        insider_rounded = round(insider_val, 4)
         output = [
             ForecastOutput(
-                date=row["ds"].strftime("%Y-%m-%d"),
-                open=round(float(row["yhat"]), 2),
-                high=round(float(row["yhat_upper"]), 2),
-                low=round(float(row["yhat_lower"]), 2),
+                date=date,
+                open=round(yhat, 2),
+                high=round(yhat_upper, 2),
+                low=round(yhat_lower, 2),
                 close=None,
-                trend=round(float(row["trend"]), 2),
-                trend_lower=round(float(row["trend_lower"]), 2),
-                trend_upper=round(float(row["trend_upper"]), 2),
-                yhat_lower=round(float(row["yhat_lower"]), 2),
-                yhat_upper=round(float(row["yhat_upper"]), 2),
-                momentum=round(float(row["momentum"]), 4),
-                acceleration=round(float(row["acceleration"]), 6),
-                insider_signal=round(insider_val, 4),
+                trend=round(trend, 2),
+                trend_lower=round(trend_lower, 2),
+                trend_upper=round(trend_upper, 2),
+                yhat_lower=round(yhat_lower, 2),
+                yhat_upper=round(yhat_upper, 2),
+                momentum=round(momentum, 4),
+                acceleration=round(acceleration, 6),
+                insider_signal=insider_rounded,
             )
-            for _, row in result.iterrows()
+            for date, yhat, yhat_lower, yhat_upper, trend, trend_lower, trend_upper, momentum, acceleration in columns
         ]
         return output
 
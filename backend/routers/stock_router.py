@@ -16,10 +16,11 @@ stock_router = APIRouter()
 EASTERN = pytz.timezone("America/New_York")
 logger = logging.getLogger(__name__)
 
-VALID_TICKERS = [
+# Only used for membership checks (here and in prefetch_router), so a frozenset
+VALID_TICKERS = frozenset({
     "META", "AAPL", "GOOGL", "MSFT", "AMZN", "TSLA", "NVDA", "NFLX",
     "JPM", "JNJ", "V", "UNH", "HD", "DIS", "BAC", "XOM", "PG", "MA", "PEP", "WMT",
-]
+})
 
 
 def get_current_user(token: str = Depends(oauth2_scheme)):
@@ -180,6 +180,7 @@ def update_sec_data():
     Runs daily at 7:00 AM EST (SEC filings typically posted after hours).
     """
     from scripts.sec_filing_data_extraction_script import insert_form4_data
+    from services.sec_service import invalidate_transactions
     
     start_time = datetime.now()
     logger.info("=" * 50)
@@ -195,6 +196,7 @@ def update_sec_data():
             logger.info(f"Updating SEC data for {ticker} (CIK: {cik})...")
             time.sleep(1)
             retry_on_failure(insert_form4_data, ticker, cik)
+            invalidate_transactions(ticker)
             logger.info(f"[SUCCESS] SEC data updated for {ticker}")
             successful += 1
             _emit_data_refresh_event(
@@ -447,6 +449,13 @@ def trigger_sec_update_now():
     update_sec_data()
 
 
+def trigger_all_updates_now():
+    """Manually trigger stock, SEC and alert updates in sequence (for testing/admin)."""
+    trigger_stock_update_now()
+    trigger_sec_update_now()
+    trigger_alert_scan_now()
+
+
 def trigger_alert_scan_now():
     """Manually trigger alert event scan (for testing/admin)."""
     logger.info("Manual trigger: Alert event scan")
@@ -1,8 +1,17 @@
 import os
 from typing import Any
 
+from pymongo.collation import Collation, CollationStrength
+
 ADMIN_ROLE_VALUES = {"admin", "owner", "superadmin"}
 
+# The only user fields is_admin_user() reads; use as a find_one projection.
+ADMIN_USER_PROJECTION = {"_id": 0, "email": 1, "role": 1, "is_admin": 1}
+
+# Case-insensitive email matching. Queries must pass this exact collation for the
+# planner to use the idx_email_ci index created in ensure_indexes().
+EMAIL_COLLATION = Collation(locale="en", strength=CollationStrength.SECONDARY)
+
 
 def _parse_admin_emails(raw_value: str | None) -> set[str]:
     if not raw_value:
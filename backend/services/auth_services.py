@@ -1,6 +1,8 @@
 import os
 import hashlib
+import hmac
 import secrets
+import time
 from datetime import datetime, timedelta, timezone
 import bcrypt
 from jose import JWTError, jwt
@@ -14,6 +16,30 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "480"))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
 
+# Verified access-token payloads are cached briefly, keyed by a digest of the
+# token (never the raw token), so repeat requests skip the signature check.
+# Entries never outlive the token's own exp; failures are not cached.
+ACCESS_TOKEN_CACHE_TTL_SECONDS = 30
+_ACCESS_TOKEN_CACHE_MAX = 10000
+_access_token_cache: dict[bytes, tuple[float, dict]] = {}  # digest -> (expires_at, payload)
+
+# Signed access tokens are reused per subject for a short window, so a burst of
+# logins/refreshes for one user signs once. The reused token loses at most the
+# window from its lifetime.
+ISSUED_TOKEN_CACHE_TTL_SECONDS = 30
+_ISSUED_TOKEN_CACHE_MAX = 10000
+_issued_token_cache: dict[str, tuple[float, str]] = {}  # sub -> (issued_at, token)
+
+# Successful bcrypt checks are remembered briefly under an HMAC of the email,
+# stored hash and password; no password material is kept. Including the stored
+# hash means a password change never matches an old entry. 0 disables the cache.
+try:
+    AUTH_VERIFY_CACHE_TTL = max(0, int(os.getenv("AUTH_VERIFY_CACHE_TTL", "60").strip() or "60"))
+except ValueError:
+    AUTH_VERIFY_CACHE_TTL = 60
+_VERIFY_CACHE_MAX = 10000
+_verified_password_cache: dict[bytes, float] = {}  # digest -> verified_at
+
 
 def decode_access_google_token(token: str):
     client_ids = [value.strip() for value in os.getenv("GOOGLE_CLIENT_IDS", "").split(",") if value.strip()]
@@ -47,6 +73,32 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(password_bytes, hashed_bytes)
 
 
+def _password_cache_key(email: str, plain_password: str, hashed_password: str) -> bytes:
+    message = f"{email}:{hashed_password}:{plain_password}".encode("utf-8")
+    return hmac.new(SECRET_KEY.encode("utf-8"), message, hashlib.sha256).digest()
+
+
+def is_password_verification_cached(email: str, plain_password: str, hashed_password: str) -> bool:
+    if not AUTH_VERIFY_CACHE_TTL:
+        return False
+    key = _password_cache_key(email, plain_password, hashed_password)
+    verified_at = _verified_password_cache.get(key)
+    if verified_at is None:
+        return False
+    if time.time() - verified_at >= AUTH_VERIFY_CACHE_TTL:
+        _verified_password_cache.pop(key, None)
+        return False
+    return True
+
+
+def remember_password_verification(email: str, plain_password: str, hashed_password: str) -> None:
+    if not AUTH_VERIFY_CACHE_TTL:
+        return
+    if len(_verified_password_cache) >= _VERIFY_CACHE_MAX:
+        _verified_password_cache.clear()
+    _verified_password_cache[_password_cache_key(email, plain_password, hashed_password)] = time.time()
+
+
 def create_access_token(data: dict, expires_minutes: int = ACCESS_TOKEN_EXPIRE_MINUTES):
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(minutes=expires_minutes)
@@ -55,9 +107,33 @@ def create_access_token(data: dict, expires_minutes: int = ACCESS_TOKEN_EXPIRE_M
     return encoded_jwt
 
 
-def create_refresh_token(data: dict, expires_days: int = REFRESH_TOKEN_EXPIRE_DAYS):
-    token_id = secrets.token_urlsafe(32)
-    expire = datetime.now(timezone.utc) + timedelta(days=expires_days)
+def create_access_token_cached(sub: str) -> str:
+    now = time.time()
+    entry = _issued_token_cache.get(sub)
+    if entry is not None and now - entry[0] < ISSUED_TOKEN_CACHE_TTL_SECONDS:
+        return entry[1]
+
+    token = create_access_token(data={"sub": sub})
+    if len(_issued_token_cache) >= _ISSUED_TOKEN_CACHE_MAX:
+        _issued_token_cache.clear()
+    _issued_token_cache[sub] = (now, token)
+    return token
+
+
+def new_refresh_token_id(expires_days: int = REFRESH_TOKEN_EXPIRE_DAYS) -> tuple[str, datetime]:
+    """Fresh (jti, expiry) pair, so callers can persist it before signing the JWT."""
+    return secrets.token_urlsafe(32), datetime.now(timezone.utc) + timedelta(days=expires_days)
+
+
+def create_refresh_token(
+    data: dict,
+    expires_days: int = REFRESH_TOKEN_EXPIRE_DAYS,
+    *,
+    token_id: str | None = None,
+    expire: datetime | None = None,
+):
+    if token_id is None or expire is None:
+        token_id, expire = new_refresh_token_id(expires_days)
     to_encode = data.copy()
     to_encode.update({
         "exp": expire,
@@ -77,11 +153,27 @@ def decode_jwt_token(token: str):
 
 
 def decode_access_token(token: str):
+    digest = hashlib.sha256(token.encode("utf-8")).digest()[:16]
+    now = time.time()
+    entry = _access_token_cache.get(digest)
+    if entry is not None:
+        if now < entry[0]:
+            return dict(entry[1])
+        _access_token_cache.pop(digest, None)
+
     payload = decode_jwt_token(token)
     if not payload:
         return None
     if payload.get("type") == "refresh":
         return None
+
+    expires_at = now + ACCESS_TOKEN_CACHE_TTL_SECONDS
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        expires_at = min(expires_at, float(exp))
+    if len(_access_token_cache) >= _ACCESS_TOKEN_CACHE_MAX:
+        _access_token_cache.clear()
+    _access_token_cache[digest] = (expires_at, dict(payload))
     return payload
 
 
@@ -96,5 +188,18 @@ def decode_refresh_token(token: str):
     return payload
 
 
+# Refresh-token ids are stored as a keyed BLAKE2b digest tagged "b2$". Older
+# documents hold a bare SHA-256 hex digest; those are still accepted on refresh
+# (see refresh_token_id_hashes) and are replaced by the rotation that follows.
+_REFRESH_HASH_PREFIX = "b2$"
+_REFRESH_HASH_KEY = hashlib.sha256(SECRET_KEY.encode("utf-8")).digest()
+
+
 def hash_refresh_token_id(token_id: str) -> str:
-    return hashlib.sha256(token_id.encode("utf-8")).hexdigest()
+    digest = hashlib.blake2b(token_id.encode("utf-8"), digest_size=32, key=_REFRESH_HASH_KEY)
+    return _REFRESH_HASH_PREFIX + digest.hexdigest()
+
+
+def refresh_token_id_hashes(token_id: str) -> list[str]:
+    """Every stored form that matches token_id: current first, then legacy SHA-256."""
+    return [hash_refresh_token_id(token_id), hashlib.sha256(token_id.encode("utf-8")).hexdigest()]
@@ -2,27 +2,50 @@
 SEC Form 4 transaction service — optimized with projection, sorting, and caching.
 
 Optimizations:
-  1. Projection: exclude _id and any extra fields
+  1. Projection: only TransactionModel fields (TRANSACTION_PROJECTION), no _id
   2. Sort by transaction_date DESC so newest transactions come first (uses index)
-  3. In-memory cache (5 min TTL) for transaction lists
+  3. In-memory cache (5 min TTL) for transaction lists, dropped per ticker on ingest;
+     empty results are cached too, so repeat forecasts for filing-less tickers skip Mongo
   4. .get() with defaults to avoid KeyError on sparse documents
+  5. Whole result lists are validated in one TypeAdapter call (pydantic-core)
+  6. Alert scans stream only purchase rows (code P) with the fields they read
 """
 
 import time
 import logging
 from datetime import datetime, timedelta
-from typing import Union, List, Optional, Dict, Tuple
+from typing import Any, Callable, Iterator, Union, List, Optional, Dict, Tuple
 
 from bson import ObjectId
+from pydantic import TypeAdapter
 from pymongo.errors import PyMongoError
 from database.database import sec_db as db
-from models.sec_form4 import TransactionModel
+from models.sec_form4 import TRANSACTION_PROJECTION, TransactionModel
 
 logger = logging.getLogger(__name__)
 
 # ─── In-memory cache (same pattern as stock_cache) ───
 _TTL_SECONDS = 300
-_cache: Dict[Tuple[str, str], Tuple[float, List[TransactionModel]]] = {}
+_CACHE_MAX = 2048
+_cache: Dict[Tuple[str, str], Tuple[float, Optional[List[TransactionModel]]]] = {}
+
+_purchase_cache: Dict[Tuple[str, str], Tuple[float, List[Dict[str, Any]]]] = {}
+
+# Derived per-ticker caches elsewhere (e.g. alert buys) drop their entries here too.
+_invalidation_callbacks: List[Callable[[str], None]] = []
+
+_TXN_LIST_ADAPTER = TypeAdapter(List[TransactionModel])
+
+_PURCHASE_PROJECTION = {
+    "_id": 0,
+    "transaction_date": 1,
+    "shares": 1,
+    "shares_owned_following_transaction": 1,
+    "reporting_owner_name": 1,
+}
+
+# The scraper stores the raw Form 4 XML text, so codes can be padded or lowercase.
+_PURCHASE_CODE_FILTER = {"$regex": r"^\s*P\s*$", "$options": "i"}
 
 _TIME_PERIOD_MAP = {
     "1w": 7,
@@ -32,27 +55,31 @@ _TIME_PERIOD_MAP = {
     "1y": 365,
 }
 
-# Only fetch fields that TransactionModel uses
-_TXN_PROJECTION = {
-    "_id": 0,
-    "filing_date": 1,
-    "issuer_name": 1,
-    "issuer_cik": 1,
-    "trading_symbol": 1,
-    "reporting_owner_name": 1,
-    "reporting_owner_cik": 1,
-    "transaction_date": 1,
-    "security_title": 1,
-    "transaction_code": 1,
-    "shares": 1,
-    "shares_owned_following_transaction": 1,
-    "price_per_share": 1,
-    "ownership_type": 1,
-    "is_director": 1,
-    "is_officer": 1,
-    "is_ten_percent_owner": 1,
-    "officer_title": 1,
-}
+
+def invalidate_transactions(ticker: str) -> None:
+    """Remove all cached transaction lists for a ticker (called after new filings are ingested)."""
+    # Runs on scheduler/admin threads while request threads insert into and clear()
+    # these dicts, so iterate a snapshot of the keys rather than the live dict.
+    for cache in (_cache, _purchase_cache):
+        for k in list(cache):
+            if k[0] == ticker:
+                cache.pop(k, None)
+    for callback in _invalidation_callbacks:
+        callback(ticker)
+
+
+def on_transactions_invalidated(callback: Callable[[str], None]) -> Callable[[str], None]:
+    """Register callback(ticker) to run whenever invalidate_transactions(ticker) does."""
+    _invalidation_callbacks.append(callback)
+    return callback
+
+
+def _date_filter(time_period: Optional[str]) -> dict:
+    if time_period and time_period in _TIME_PERIOD_MAP:
+        days = _TIME_PERIOD_MAP[time_period]
+        start = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+        return {"transaction_date": {"$gte": start}}
+    return {}
 
 
 def get_transaction_by_id(ticker: str, transaction_id: str) -> Optional[TransactionModel]:
@@ -64,7 +91,7 @@ def get_transaction_by_id(ticker: str, transaction_id: str) -> Optional[Transact
         return None
     try:
         collection = db[f"form_4_links_{ticker}"]
-        document = collection.find_one({"_id": transaction_id_obj})
+        document = collection.find_one({"_id": transaction_id_obj}, TRANSACTION_PROJECTION)
         if document:
             return TransactionModel(**document)
         logger.warning("Transaction not found: %s in %s", transaction_id, ticker)
@@ -93,29 +120,59 @@ def get_all_transactions(ticker: str, time_period: Optional[str] = None) -> Unio
     try:
         collection = db[f"form_4_links_{ticker}"]
 
-        date_filter: dict = {}
-        if time_period and time_period in _TIME_PERIOD_MAP:
-            days = _TIME_PERIOD_MAP[time_period]
-            start = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
-            date_filter = {"transaction_date": {"$gte": start}}
+        date_filter = _date_filter(time_period)
 
         # Sort by transaction_date DESC (uses idx_txn_date_desc index)
         cursor = (
-            collection.find(date_filter, _TXN_PROJECTION)
+            collection.find(date_filter, TRANSACTION_PROJECTION)
             .sort("transaction_date", -1)
         )
 
-        transactions = [TransactionModel(**doc) for doc in cursor]
+        transactions = _TXN_LIST_ADAPTER.validate_python(list(cursor)) or None
 
-        if transactions:
-            _cache[cache_key] = (time.time(), transactions)
-            return transactions
-        else:
+        # Tickers come from request paths, so bound the cache now that misses are stored.
+        if len(_cache) >= _CACHE_MAX:
+            _cache.clear()
+        _cache[cache_key] = (time.time(), transactions)
+        if transactions is None:
             logger.warning("No transactions for %s in period %s", ticker, time_period)
-            return None
+        return transactions
 
     except PyMongoError as e:
         logger.error("DB error retrieving transactions for %s: %s", ticker, e)
     except Exception as e:
         logger.error("Unexpected error retrieving transactions for %s: %s", ticker, e)
     return None
+
+
+def iter_purchase_rows(ticker: str, time_period: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Stream open-market purchase rows (transaction code P), oldest first, with
+    only the fields alert scans read. Filtering happens in Mongo, so sales,
+    grants and other codes never reach the process.
+    """
+    collection = db[f"form_4_links_{ticker}"]
+    query = {"transaction_code": _PURCHASE_CODE_FILTER, **_date_filter(time_period)}
+    yield from collection.find(query, _PURCHASE_PROJECTION).sort("transaction_date", 1)
+
+
+def get_purchase_rows(ticker: str, time_period: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Cached list form of iter_purchase_rows (same TTL and invalidation as transactions)."""
+    cache_key = (ticker, time_period or "all")
+    entry = _purchase_cache.get(cache_key)
+    if entry is not None:
+        ts, rows = entry
+        if time.time() - ts <= _TTL_SECONDS:
+            return rows
+        _purchase_cache.pop(cache_key, None)
+
+    try:
+        rows = list(iter_purchase_rows(ticker, time_period))
+    except PyMongoError as e:
+        logger.error("DB error retrieving purchases for %s: %s", ticker, e)
+        return []
+    # Alert-rule tickers are free-form user input, so bound this like _cache.
+    if len(_purchase_cache) >= _CACHE_MAX:
+        _purchase_cache.clear()
+    _purchase_cache[cache_key] = (time.time(), rows)
+    return rows
@@ -6,14 +6,19 @@ Optimizations:
   2. Index-aware sort: sort on Date DESC uses the index, no in-memory sort
   3. Batch conversion: list comprehension instead of loop + append
   4. Compound indexes: Date descending for range queries + sort
-  5. ensure_indexes covers ALL collections (stocks, SEC, users)
+  5. ensure_indexes covers ALL collections (stocks, SEC, users) and runs on the
+     async client so startup does not block the event loop
+  6. ensure_indexes records CURRENT_IDX_VERSION and the indexes it built in
+     stock_db.meta, so later boots only create indexes for new collections
 """
 
 from datetime import datetime, timedelta
-from database.database import stock_db, sec_db, user_db
+from database.database import stock_db, async_stock_db, async_sec_db, async_user_db
 from typing import List, Optional
 from models.stock_data import StockDataModel
+from services.admin_access import EMAIL_COLLATION
 import pymongo
+from pymongo.errors import OperationFailure
 import pytz
 import logging
 
@@ -29,6 +34,10 @@ TIME_PERIOD_DAYS = {
 
 EASTERN = pytz.timezone("America/New_York")
 
+# Bump whenever the index set in ensure_indexes() changes.
+CURRENT_IDX_VERSION = 2
+_SCHEMA_META_ID = "schema"
+
 # Projection: only fetch the fields we actually serialize.
 # Excluding _id and any extra fields saves bytes over the wire.
 _STOCK_PROJECTION = {
@@ -79,50 +88,118 @@ def fetch_stock_data(
     ]
 
 
-def ensure_indexes() -> None:
+async def _log_email_case_duplicates() -> None:
+    """Name the users whose emails differ only by case and block idx_email_ci."""
+    try:
+        cursor = await async_user_db["users"].aggregate([
+            {"$group": {"_id": {"$toLower": "$email"}, "count": {"$sum": 1}}},
+            {"$match": {"count": {"$gt": 1}}},
+            {"$limit": 20},
+        ])
+        conflicts = [doc["_id"] for doc in await cursor.to_list()]
+    except Exception as e:
+        logger.warning("idx_email_ci blocked by case-duplicate emails; lookup failed: %s", e)
+        return
+    logger.warning(
+        "idx_email_ci not built: emails differing only by case must be merged first: %s",
+        ", ".join(conflicts),
+    )
+
+
+async def ensure_indexes() -> None:
     """
     Create indexes across ALL databases for optimal query performance.
 
     MongoDB M0 free tier supports up to 64 indexes per collection.
     We create sparse, targeted indexes that match our query patterns.
+    The meta document records CURRENT_IDX_VERSION together with every index
+    already built, so a boot only issues create_index for what is missing --
+    e.g. the collection of a ticker ingested since the last run.
     """
-    created = 0
+    meta = async_stock_db["meta"]
+    done: set[str] = set()
+    try:
+        doc = await meta.find_one({"_id": _SCHEMA_META_ID})
+        if doc and doc.get("idx_version") == CURRENT_IDX_VERSION:
+            done = set(doc.get("indexed") or ())
+    except Exception as e:
+        logger.warning("Index version lookup failed: %s", e)
+
+    built: list[str] = []
 
     # ─── Stock data: Date DESC (used by range query + sort) ───
     try:
-        for name in stock_db.list_collection_names():
-            if name.startswith("stock_data_"):
-                stock_db[name].create_index(
+        for name in await async_stock_db.list_collection_names():
+            if name.startswith("stock_data_") and name not in done:
+                await async_stock_db[name].create_index(
                     [("Date", pymongo.DESCENDING)],
                     background=True,
                 )
-                created += 1
+                built.append(name)
     except Exception as e:
         logger.warning("Stock index creation failed: %s", e)
 
     # ─── SEC / Form 4 transactions: transaction_date DESC ───
     try:
-        for name in sec_db.list_collection_names():
-            if name.startswith("form_4_links_"):
-                sec_db[name].create_index(
+        for name in await async_sec_db.list_collection_names():
+            if name.startswith("form_4_links_") and name not in done:
+                await async_sec_db[name].create_index(
                     [("transaction_date", pymongo.DESCENDING)],
                     name="idx_txn_date_desc",
                     background=True,
                 )
-                created += 1
+                built.append(name)
     except Exception as e:
         logger.warning("SEC index creation failed: %s", e)
 
     # ─── Users: unique email index for fast login lookups ───
+    if "users.idx_email_unique" not in done:
+        try:
+            await async_user_db["users"].create_index(
+                [("email", pymongo.ASCENDING)],
+                name="idx_email_unique",
+                unique=True,
+                background=True,
+            )
+            built.append("users.idx_email_unique")
+        except Exception as e:
+            logger.warning("User email index creation failed: %s", e)
+
+    # ─── Users: case-insensitive email index (lookups pass EMAIL_COLLATION) ───
+    if "users.idx_email_ci" not in done:
+        try:
+            await async_user_db["users"].create_index(
+                [("email", pymongo.ASCENDING)],
+                name="idx_email_ci",
+                unique=True,
+                collation=EMAIL_COLLATION,
+                background=True,
+            )
+            built.append("users.idx_email_ci")
+        except OperationFailure as e:
+            if e.code == 11000:
+                await _log_email_case_duplicates()
+            else:
+                logger.warning("User case-insensitive email index creation failed: %s", e)
+        except Exception as e:
+            logger.warning("User case-insensitive email index creation failed: %s", e)
+
+    if not built:
+        if done:
+            logger.info("Database indexes already at version %d", CURRENT_IDX_VERSION)
+        return
+    logger.info("Database indexes ensured (%d created)", len(built))
+
+    # Failed indexes stay out of "indexed" and are retried on the next boot.
     try:
-        user_db["users"].create_index(
-            [("email", pymongo.ASCENDING)],
-            name="idx_email_unique",
-            unique=True,
-            background=True,
+        await meta.update_one(
+            {"_id": _SCHEMA_META_ID},
+            {"$set": {
+                "idx_version": CURRENT_IDX_VERSION,
+                "indexed": sorted(done.union(built)),
+                "updated_at": datetime.utcnow(),
+            }},
+            upsert=True,
         )
-        created += 1
     except Exception as e:
-        logger.warning("User email index creation failed: %s", e)
-
-    logger.info("Database indexes ensured (%d collections)", created)
+        logger.warning("Index version update failed: %s", e)
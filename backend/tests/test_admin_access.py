@@ -1,12 +1,37 @@
+import asyncio
+import os
 import sys
+import types
 from pathlib import Path
 
+from starlette.requests import Request
+
 
 ROOT = Path(__file__).resolve().parents[2]
 BACKEND_DIR = ROOT / "backend"
 if str(BACKEND_DIR) not in sys.path:
     sys.path.insert(0, str(BACKEND_DIR))
 
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret-key")
+
+
+class _NoopCollection:
+    def find_one(self, *_args, **_kwargs):
+        return None
+
+
+class _NoopDB:
+    def __getitem__(self, _name: str):
+        return _NoopCollection()
+
+
+if "database.database" not in sys.modules:
+    fake_db_module = types.ModuleType("database.database")
+    fake_db_module.user_db = _NoopDB()
+    fake_db_module.stock_db = _NoopDB()
+    fake_db_module.sec_db = _NoopDB()
+    sys.modules["database.database"] = fake_db_module
+
 from services.admin_access import is_admin_user
 
 
@@ -30,3 +55,152 @@ def test_is_admin_user_false_when_no_admin_flags(monkeypatch):
     monkeypatch.setenv("ADMIN_EMAILS", "admin@example.com")
     assert is_admin_user({"email": "user@example.com"}) is False
     assert is_admin_user({"email": "user@example.com", "role": "member"}) is False
+
+
+def test_verify_admin_access_caches_successful_bearer_checks(monkeypatch):
+    from routers import admin_router
+
+    calls = {"decode": 0, "find_one": 0}
+
+    def _fake_decode(_token):
+        calls["decode"] += 1
+        return {"sub": "Admin@Example.com", "exp": 4_102_444_800}
+
+    def _fake_find_one(query, *_args, **_kwargs):
+        calls["find_one"] += 1
+        return {"email": query["email"], "role": "admin"}
+
+    monkeypatch.setattr(admin_router, "ALLOW_INSECURE_ADMIN", False)
+    monkeypatch.setattr(admin_router, "decode_access_token", _fake_decode)
+    monkeypatch.setattr(admin_router, "db", types.SimpleNamespace(users=types.SimpleNamespace(find_one=_fake_find_one)))
+    monkeypatch.setattr(admin_router, "_admin_token_cache", {})
+
+    def _request():
+        return Request({"type": "http", "headers": [(b"authorization", b"Bearer token-a")]})
+
+    first = asyncio.run(admin_router.verify_admin_access(_request()))
+    second = asyncio.run(admin_router.verify_admin_access(_request()))
+
+    assert first == second == {"auth": "bearer", "email": "admin@example.com"}
+    assert calls == {"decode": 1, "find_one": 1}
+
+
+def test_submit_trigger_runs_on_admin_trigger_pool():
+    import threading
+
+    from routers import admin_router
+
+    seen: dict = {}
+
+    def _job():
+        seen["thread"] = threading.current_thread().name
+
+    async def _run():
+        admin_router._submit_trigger(_job)
+        pending = list(admin_router._pending_triggers)
+        await asyncio.gather(*pending)
+        await asyncio.sleep(0)
+        return pending
+
+    pending = asyncio.run(_run())
+
+    assert pending
+    assert seen["thread"].startswith("admin-trig")
+    assert not admin_router._pending_triggers
+
+
+def test_verify_admin_access_accepts_api_key_without_bearer(monkeypatch):
+    from routers import admin_router
+
+    def _unexpected_decode(_token):
+        raise AssertionError("bearer token should not be decoded when the API key matches")
+
+    monkeypatch.setattr(admin_router, "ADMIN_API_KEY", "cron-key")
+    monkeypatch.setattr(admin_router, "decode_access_token", _unexpected_decode)
+    request = Request({"type": "http", "headers": [(b"x-api-key", b"cron-key"), (b"authorization", b"Bearer x")]})
+
+    assert asyncio.run(admin_router.verify_admin_access(request)) == {"auth": "api_key"}
+
+
+def test_admin_health_serves_precomputed_body_and_304_on_matching_etag():
+    import json
+
+    from routers import admin_router
+
+    response = asyncio.run(admin_router.health_check(Request({"type": "http", "headers": []})))
+    assert response.status_code == 200
+    assert json.loads(response.body) == {"status": "healthy", "tickers": list(admin_router.VALID_TICKERS)}
+    assert response.headers["cache-control"] == "max-age=30"
+
+    etag = response.headers["etag"].encode()
+    revalidated = asyncio.run(admin_router.health_check(Request({"type": "http", "headers": [(b"if-none-match", etag)]})))
+    assert revalidated.status_code == 304
+    assert revalidated.body == b""
+
+
+def test_list_scheduled_jobs_reuses_recent_snapshot(monkeypatch):
+    from routers import admin_router
+
+    calls = {"count": 0}
+
+    def _fake_jobs():
+        calls["count"] += 1
+        return [{"id": "stock_update"}]
+
+    monkeypatch.setattr(admin_router, "get_scheduled_jobs", _fake_jobs)
+    monkeypatch.setattr(admin_router, "_jobs_cache", None)
+
+    assert admin_router.list_scheduled_jobs()["jobs"] == [{"id": "stock_update"}]
+    assert admin_router.list_scheduled_jobs()["jobs"] == [{"id": "stock_update"}]
+    assert calls["count"] == 1
+
+
+def test_verify_admin_access_reuses_static_rejection(monkeypatch):
+    import traceback
+
+    import pytest
+    from fastapi import HTTPException
+
+    from routers import admin_router
+
+    monkeypatch.setattr(admin_router, "ALLOW_INSECURE_ADMIN", False)
+    monkeypatch.setattr(admin_router, "ADMIN_API_KEY", "cron-key")
+    request = Request({"type": "http", "headers": [(b"x-api-key", b"wrong")]})
+
+    depths = []
+    for _ in range(3):
+        with pytest.raises(HTTPException) as exc_info:
+            asyncio.run(admin_router.verify_admin_access(request))
+        assert exc_info.value is admin_router._EXC_INVALID_CREDS
+        assert exc_info.value.status_code == 401
+        depths.append(len(traceback.extract_tb(exc_info.value.__traceback__)))
+
+    assert depths[0] == depths[-1]
+
+
+def test_update_single_stock_rejects_overlapping_run_for_same_ticker(monkeypatch):
+    import pytest
+    from fastapi import HTTPException
+
+    from routers import admin_router
+
+    async def _fake_run_blocking(_func, *_args):
+        await asyncio.sleep(0.05)
+
+    monkeypatch.setattr(admin_router, "_save_stock_data", lambda: (lambda _ticker: None))
+    monkeypatch.setattr(admin_router, "_run_blocking", _fake_run_blocking)
+
+    async def _run():
+        return await asyncio.gather(
+            admin_router.update_single_stock("AAPL"),
+            admin_router.update_single_stock("AAPL"),
+            admin_router.update_single_stock("MSFT"),
+            return_exceptions=True,
+        )
+
+    first, duplicate, other = asyncio.run(_run())
+
+    assert first["status"] == "ok"
+    assert isinstance(duplicate, HTTPException) and duplicate.status_code == 409
+    assert other["ticker"] == "MSFT"
+    assert not admin_router._STOCK_UPDATE_LOCKS["AAPL"].locked()
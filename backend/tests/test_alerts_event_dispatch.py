@@ -3,9 +3,11 @@ from __future__ import annotations
 import sys
 import types
 import os
+import re
 from pathlib import Path
 
 from bson import ObjectId
+from pymongo.errors import BulkWriteError
 
 BACKEND_DIR = Path(__file__).resolve().parents[1]
 if str(BACKEND_DIR) not in sys.path:
@@ -62,15 +64,16 @@ class _FakeRulesCollection:
     def __init__(self, docs: list[dict]):
         self.docs = docs
 
-    def find(self, _query: dict):
+    def find(self, _query: dict, projection: dict | None = None):
+        self.projection = projection
         return list(self.docs)
 
 
 def test_run_alert_scan_for_user_publishes_event_and_skips_fallback(monkeypatch):
     rules = [{"_id": ObjectId(), "user_email": "u@example.com", "is_active": True}]
     monkeypatch.setattr(alerts_router, "ALERT_RULES_COLLECTION", _FakeRulesCollection(rules))
-    monkeypatch.setattr(alerts_router, "_ensure_indexes", lambda: None)
-    monkeypatch.setattr(alerts_router, "_scan_rule", lambda **_kwargs: 2)
+    monkeypatch.setattr(alerts_router, "_scan_rule", lambda **_kwargs: [{"fingerprint": "a"}, {"fingerprint": "b"}])
+    monkeypatch.setattr(alerts_router, "_insert_events_if_new", len)
     monkeypatch.setattr(alerts_router, "ENABLE_ALERT_NOTIFICATION_EVENT_BUS", True)
 
     fallback_called = {"count": 0}
@@ -91,8 +94,8 @@ def test_run_alert_scan_for_user_publishes_event_and_skips_fallback(monkeypatch)
 def test_run_alert_scan_for_user_falls_back_when_publish_fails(monkeypatch):
     rules = [{"_id": ObjectId(), "user_email": "u@example.com", "is_active": True}]
     monkeypatch.setattr(alerts_router, "ALERT_RULES_COLLECTION", _FakeRulesCollection(rules))
-    monkeypatch.setattr(alerts_router, "_ensure_indexes", lambda: None)
-    monkeypatch.setattr(alerts_router, "_scan_rule", lambda **_kwargs: 1)
+    monkeypatch.setattr(alerts_router, "_scan_rule", lambda **_kwargs: [{"fingerprint": "a"}])
+    monkeypatch.setattr(alerts_router, "_insert_events_if_new", len)
     monkeypatch.setattr(alerts_router, "ENABLE_ALERT_NOTIFICATION_EVENT_BUS", True)
     monkeypatch.setattr(alerts_router, "_publish_realtime_dispatch_event", lambda **_kwargs: False)
 
@@ -108,3 +111,367 @@ def test_run_alert_scan_for_user_falls_back_when_publish_fails(monkeypatch):
     assert generated == 1
     assert total_rules == 1
     assert fallback_called["count"] == 1
+
+
+class _FakeEventsCollection:
+    def __init__(self, duplicate_indexes: set[int]):
+        self.duplicate_indexes = duplicate_indexes
+        self.calls: list[tuple[int, bool]] = []
+
+    def insert_many(self, docs: list[dict], ordered: bool = True):
+        self.calls.append((len(docs), ordered))
+        errors = [{"index": i, "code": 11000, "errmsg": "E11000 duplicate key"} for i in sorted(self.duplicate_indexes)]
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(docs) - len(errors)})
+        return types.SimpleNamespace(inserted_ids=list(range(len(docs))))
+
+
+def test_insert_events_if_new_batches_and_skips_duplicates(monkeypatch):
+    events = _FakeEventsCollection(duplicate_indexes={1})
+    monkeypatch.setattr(alerts_router, "ALERT_EVENTS_COLLECTION", events)
+
+    inserted = alerts_router._insert_events_if_new([{"fingerprint": "a"}, {"fingerprint": "b"}, {"fingerprint": "c"}])
+
+    assert inserted == 2
+    assert events.calls == [(3, False)]
+    assert alerts_router._insert_events_if_new([]) == 0
+    assert events.calls == [(3, False)]
+
+
+class _FakeSortedRulesCursor:
+    def __init__(self, docs: list[dict]):
+        self.docs = docs
+        self.sort_spec = None
+
+    def sort(self, key: str, direction: int):
+        self.sort_spec = (key, direction)
+        return sorted(self.docs, key=lambda doc: doc.get(key) or "")
+
+
+class _FakeAllRulesCollection:
+    def __init__(self, docs: list[dict]):
+        self.docs = docs
+        self.queries: list[dict] = []
+
+    def find(self, query: dict, projection: dict | None = None):
+        self.queries.append(query)
+        self.projection = projection
+        return _FakeSortedRulesCursor(self.docs)
+
+
+def test_run_alert_scan_for_all_users_groups_rules_from_one_query(monkeypatch):
+    rules = [
+        {"_id": ObjectId(), "user_email": "b@example.com", "is_active": True},
+        {"_id": ObjectId(), "user_email": "a@example.com", "is_active": True},
+        {"_id": ObjectId(), "user_email": "b@example.com", "is_active": True},
+    ]
+    collection = _FakeAllRulesCollection(rules)
+    scanned: list[tuple[str, int]] = []
+    monkeypatch.setattr(alerts_router, "ALERT_RULES_COLLECTION", collection)
+    monkeypatch.setattr(
+        alerts_router,
+        "_scan_rules_for_user",
+        lambda email, user_rules, **_kwargs: scanned.append((email, len(user_rules))) or 1,
+    )
+
+    summary = alerts_router.run_alert_scan_for_all_users()
+
+    assert collection.queries == [{"is_active": True}]
+    assert "name" not in collection.projection and collection.projection["user_email"] == 1
+    assert sorted(scanned) == [("a@example.com", 1), ("b@example.com", 2)]
+    assert summary == {"scanned_users": 2, "failed_users": 0, "generated_events": 2, "total_rules": 3}
+    scanned.clear()
+    assert alerts_router.run_alert_scan_for_all_users(limit_users=1)["scanned_users"] == 1
+    assert scanned == [("a@example.com", 1)]
+
+
+def test_compute_buys_for_rule_normalizes_once_and_slices_by_lookback(monkeypatch):
+    from datetime import datetime, timedelta, timezone
+
+    now = datetime.now(timezone.utc)
+    today = now.date()
+    transactions = [
+        {"transaction_code": "P", "transaction_date": (today - timedelta(days=2)).isoformat(), "shares": "1,000", "reporting_owner_name": "A"},
+        {"transaction_code": "P", "transaction_date": (today - timedelta(days=20)).isoformat(), "shares": 10, "reporting_owner_name": "C"},
+    ]
+    calls = {"count": 0}
+
+    def _fake_get_purchase_rows(_ticker, _period):
+        calls["count"] += 1
+        return transactions
+
+    monkeypatch.setattr(alerts_router, "get_purchase_rows", _fake_get_purchase_rows)
+    monkeypatch.setattr(alerts_router, "_buys_cache", {})
+    cache: dict = {}
+
+    month = alerts_router._compute_buys_for_rule({"ticker": "aapl", "lookback_days": 30}, cache, now=now)
+    same_period = alerts_router._compute_buys_for_rule({"ticker": "AAPL", "lookback_days": 25}, cache, now=now)
+    recent = alerts_router._compute_buys_for_rule({"ticker": "AAPL", "lookback_days": 7}, {("AAPL", "1w"): cache[("AAPL", "1m")]}, now=now)
+
+    assert calls["count"] == 1
+    assert [buy["owner"] for buy in month] == ["C", "A"]
+    assert same_period == month
+    assert [buy["owner"] for buy in recent] == ["A"]
+    assert recent[0]["shares"] == 1000.0
+    assert alerts_router._lookback_bucket(30, today) == ("1m", today - timedelta(days=30))
+
+
+def test_get_buys_reuses_normalized_rows_until_transactions_change(monkeypatch):
+    from datetime import datetime, timezone
+
+    day = datetime.now(timezone.utc).date().isoformat()
+    current = {"rows": [{"transaction_code": "P", "transaction_date": day, "shares": 5, "reporting_owner_name": "A"}]}
+    normalize_calls = {"count": 0}
+    real_normalize = alerts_router._normalize_buys
+
+    def _counting_normalize(transactions):
+        normalize_calls["count"] += 1
+        return real_normalize(transactions)
+
+    monkeypatch.setattr(alerts_router, "get_purchase_rows", lambda _ticker, _period: current["rows"])
+    monkeypatch.setattr(alerts_router, "_normalize_buys", _counting_normalize)
+    monkeypatch.setattr(alerts_router, "_buys_cache", {})
+
+    first = alerts_router._get_buys("MSFT", "1m")
+    assert alerts_router._get_buys("MSFT", "1m") is first
+    assert normalize_calls["count"] == 1
+
+    current["rows"] = current["rows"] + [{"transaction_code": "P", "transaction_date": day, "shares": 7, "reporting_owner_name": "B"}]
+    refreshed = alerts_router._get_buys("MSFT", "1m")
+    assert normalize_calls["count"] == 2
+    assert len(refreshed) == 2
+
+
+def test_sec_invalidate_transactions_drops_only_that_ticker(monkeypatch):
+    from services import sec_service
+
+    monkeypatch.setattr(alerts_router, "_buys_cache", {("AAPL", "1m"): ([], []), ("MSFT", "1m"): ([], [])})
+    sec_service._cache[("AAPL", "1m")] = (0.0, [])
+    sec_service._cache[("AAPL", "all")] = (0.0, [])
+    sec_service._cache[("MSFT", "1m")] = (0.0, [])
+    sec_service._purchase_cache[("AAPL", "1m")] = (0.0, [])
+    try:
+        sec_service.invalidate_transactions("AAPL")
+        assert set(sec_service._cache) == {("MSFT", "1m")}
+        assert not sec_service._purchase_cache
+        assert set(alerts_router._buys_cache) == {("MSFT", "1m")}
+    finally:
+        sec_service._cache.clear()
+        sec_service._purchase_cache.clear()
+
+
+def test_purchase_and_buys_caches_are_bounded(monkeypatch):
+    from services import sec_service
+
+    class _Collection:
+        def find(self, _query, _projection):
+            return self
+
+        def sort(self, _key, _direction):
+            return iter([])
+
+    monkeypatch.setattr(sec_service, "db", {"form_4_links_A": _Collection(), "form_4_links_B": _Collection()})
+    monkeypatch.setattr(sec_service, "_purchase_cache", {})
+    monkeypatch.setattr(sec_service, "_CACHE_MAX", 1)
+    sec_service.get_purchase_rows("A", "1m")
+    sec_service.get_purchase_rows("B", "1m")
+    assert set(sec_service._purchase_cache) == {("B", "1m")}
+
+    monkeypatch.setattr(alerts_router, "get_purchase_rows", lambda _ticker, _period: [])
+    monkeypatch.setattr(alerts_router, "_buys_cache", {})
+    monkeypatch.setattr(alerts_router, "_BUYS_CACHE_MAX", 1)
+    alerts_router._get_buys("A", "1m")
+    alerts_router._get_buys("B", "1m")
+    assert set(alerts_router._buys_cache) == {("B", "1m")}
+
+
+def test_get_purchase_rows_filters_to_buys_in_mongo_and_caches(monkeypatch):
+    from services import sec_service
+
+    queries: list[tuple[dict, dict]] = []
+
+    class _Cursor(list):
+        def sort(self, key, direction):
+            assert (key, direction) == ("transaction_date", 1)
+            return self
+
+    class _Collection:
+        def find(self, query, projection):
+            queries.append((query, projection))
+            return _Cursor([{"transaction_code": "P", "transaction_date": "2024-05-01"}])
+
+    monkeypatch.setattr(sec_service, "db", {"form_4_links_AAPL": _Collection()})
+    monkeypatch.setattr(sec_service, "_purchase_cache", {})
+
+    first = sec_service.get_purchase_rows("AAPL", "1m")
+    assert sec_service.get_purchase_rows("AAPL", "1m") is first
+    assert len(queries) == 1
+    query, projection = queries[0]
+    code_pattern = re.compile(query["transaction_code"]["$regex"], re.IGNORECASE)
+    assert all(code_pattern.match(code) for code in ("P", " p ", "P\n"))
+    assert not any(code_pattern.match(code) for code in ("S", "PS", "A"))
+    assert "$gte" in query["transaction_date"]
+    assert projection == sec_service._PURCHASE_PROJECTION
+    assert set(projection) < {"_id", *sec_service.TRANSACTION_PROJECTION}
+
+
+def test_get_all_transactions_caches_empty_results(monkeypatch):
+    from services import sec_service
+
+    calls = {"count": 0}
+
+    class _Cursor(list):
+        def sort(self, *_args):
+            return self
+
+    class _Collection:
+        def find(self, *_args):
+            calls["count"] += 1
+            return _Cursor()
+
+    monkeypatch.setattr(sec_service, "db", {"form_4_links_ZZZZ": _Collection()})
+    monkeypatch.setattr(sec_service, "_cache", {})
+
+    assert sec_service.get_all_transactions("ZZZZ", "1y") is None
+    assert sec_service.get_all_transactions("ZZZZ", "1y") is None
+    assert calls["count"] == 1
+    sec_service.invalidate_transactions("ZZZZ")
+    assert sec_service.get_all_transactions("ZZZZ", "1y") is None
+    assert calls["count"] == 2
+
+
+class _FakeSummaryCollection:
+    name = "alert_events"
+
+    def __init__(self, counts: dict[str, int], rows: list[dict]):
+        self.counts = counts
+        self.rows = rows
+        self.count_filters: list[dict] = []
+        self.pipelines: list[list[dict]] = []
+
+    def count_documents(self, query: dict) -> int:
+        self.count_filters.append(query)
+        return self.counts["high" if "severity" in query else "unread"]
+
+    def aggregate(self, pipeline: list[dict]):
+        self.pipelines.append(pipeline)
+        return iter(self.rows)
+
+
+def test_get_alert_summary_counts_with_indexed_queries_and_merges_latest_and_preview(monkeypatch):
+    from datetime import datetime, timezone
+
+    created = datetime(2024, 5, 1, tzinfo=timezone.utc)
+    event_id = ObjectId()
+    collection = _FakeSummaryCollection(
+        {"unread": 3, "high": 1},
+        [
+            {"created_at": created, "latest": True},
+            {"_id": event_id, "ticker": "AAPL", "title": "t", "message": "m", "severity": "high", "created_at": created},
+        ],
+    )
+    monkeypatch.setattr(alerts_router, "ALERT_EVENTS_COLLECTION", collection)
+
+    summary = alerts_router.get_alert_summary.__wrapped__(None, limit=5, user_email="u@example.com")
+
+    assert collection.count_filters == [
+        {"user_email": "u@example.com", "is_read": False},
+        {"user_email": "u@example.com", "is_read": False, "severity": "high"},
+    ]
+    assert len(collection.pipelines) == 1
+    assert not any("$facet" in stage for stage in collection.pipelines[0])
+    assert summary.unread_count == 3
+    assert summary.high_severity_unread == 1
+    assert summary.latest_event_at == created.isoformat()
+    assert [item.id for item in summary.items] == [str(event_id)]
+
+    collection.counts, collection.rows = {"unread": 0, "high": 0}, []
+    empty = alerts_router.get_alert_summary.__wrapped__(None, limit=5, user_email="u@example.com")
+    assert (empty.unread_count, empty.high_severity_unread, empty.latest_event_at, empty.items) == (0, 0, None, [])
+
+
+def test_scan_rule_aggregates_repeat_and_cluster_buys_in_one_pass(monkeypatch):
+    from datetime import date, datetime, timezone
+
+    now = datetime(2024, 5, 5, tzinfo=timezone.utc)
+
+    buys = [
+        {"transaction_day": date(2024, 5, 1), "shares": 10.0, "owner": "A"},
+        {"transaction_day": date(2024, 5, 2), "shares": 5.0, "owner": "B"},
+        {"transaction_day": date(2024, 5, 3), "shares": 20.0, "owner": "A"},
+        {"transaction_day": date(2024, 5, 4), "shares": 1.0, "owner": "C"},
+    ]
+    monkeypatch.setattr(alerts_router, "_compute_buys_for_rule", lambda _rule, _cache, **_kwargs: list(buys))
+
+    repeat = alerts_router._scan_rule(
+        user_email="u@example.com",
+        rule={"_id": ObjectId(), "rule_type": "repeat_buyer", "ticker": "AAPL", "threshold": 2},
+        transactions_cache={},
+        now=now,
+    )
+    assert [event["details"] for event in repeat] == [
+        {"owner": "A", "buy_count": 2, "total_shares": 30.0, "threshold": 2}
+    ]
+    assert repeat[0]["occurred_at"].date() == date(2024, 5, 3)
+
+    cluster = alerts_router._scan_rule(
+        user_email="u@example.com",
+        rule={"_id": ObjectId(), "rule_type": "cluster_buying", "ticker": "AAPL", "threshold": 4},
+        transactions_cache={},
+        now=now,
+    )
+    assert cluster[0]["details"] == {"buy_count": 4, "unique_insiders": 3, "total_shares": 36.0, "threshold": 4}
+    assert cluster[0]["severity"] == "high"
+    assert cluster[0]["occurred_at"].date() == date(2024, 5, 4)
+    assert repeat[0]["created_at"] is cluster[0]["updated_at"] is now
+
+
+def test_event_fingerprint_matches_plain_sha256_of_user_and_key():
+    import hashlib
+    from datetime import datetime, timezone
+
+    now = datetime(2024, 5, 5, tzinfo=timezone.utc)
+    kwargs = dict(
+        rule={"_id": ObjectId(), "rule_type": "large_buy"},
+        ticker="AAPL",
+        title="t",
+        message="m",
+        severity="medium",
+        occurred_at=now,
+        details={},
+        now=now,
+    )
+
+    first = alerts_router._build_base_event(user_email="u@example.com", fingerprint_key="k1", **kwargs)
+    second = alerts_router._build_base_event(user_email="u@example.com", fingerprint_key="k2", **kwargs)
+
+    assert first["fingerprint"] == hashlib.sha256(b"u@example.com|k1").hexdigest()
+    assert second["fingerprint"] == hashlib.sha256(b"u@example.com|k2").hexdigest()
+
+
+def test_mark_alert_event_read_skips_write_for_already_read_event(monkeypatch):
+    import pytest
+    from fastapi import HTTPException
+
+    event_id = ObjectId()
+
+    class _FakeEvents:
+        def __init__(self):
+            self.filters: list[dict] = []
+
+        def update_one(self, query, _update):
+            self.filters.append(query)
+            return types.SimpleNamespace(matched_count=0)
+
+        def count_documents(self, query, limit=0):
+            return int(query["_id"] == event_id)
+
+    events = _FakeEvents()
+    monkeypatch.setattr(alerts_router, "ALERT_EVENTS_COLLECTION", events)
+    handler = alerts_router.mark_alert_event_read.__wrapped__
+
+    assert handler(None, str(event_id), user_email="u@example.com").message == "Alert marked as read"
+    assert events.filters[0]["is_read"] is False
+    with pytest.raises(HTTPException) as exc_info:
+        handler(None, str(ObjectId()), user_email="u@example.com")
+    assert exc_info.value.status_code == 404
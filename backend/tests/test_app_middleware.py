@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import os
+import sys
+import types
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret-key")
+
+
+class _NoopCollection:
+    def create_index(self, *_args, **_kwargs):
+        return None
+
+    def insert_one(self, *_args, **_kwargs):
+        return None
+
+    def find(self, *_args, **_kwargs):
+        return []
+
+    def find_one(self, *_args, **_kwargs):
+        return None
+
+    def update_one(self, *_args, **_kwargs):
+        return None
+
+    def count_documents(self, *_args, **_kwargs):
+        return 0
+
+
+class _NoopDB:
+    def __getitem__(self, _name: str):
+        return _NoopCollection()
+
+
+if "database.database" not in sys.modules:
+    fake_db_module = types.ModuleType("database.database")
+    fake_db_module.user_db = _NoopDB()
+    fake_db_module.stock_db = _NoopDB()
+    fake_db_module.sec_db = _NoopDB()
+    fake_db_module.client = types.SimpleNamespace(admin=types.SimpleNamespace(command=lambda *_args, **_kwargs: {"ok": 1}))
+    sys.modules["database.database"] = fake_db_module
+
+# Other test modules may have installed a sync-only fake first.
+_db_module = sys.modules["database.database"]
+for _name in ("async_user_db", "async_stock_db", "async_sec_db"):
+    if not hasattr(_db_module, _name):
+        setattr(_db_module, _name, _NoopDB())
+for _name in ("client", "async_client"):
+    if not hasattr(_db_module, _name):
+        setattr(_db_module, _name, types.SimpleNamespace())
+
+import app as app_module
+
+
+def _build_client() -> TestClient:
+    test_app = FastAPI()
+
+    @test_app.get("/stocks/AAPL")
+    async def _stocks():
+        return {"ticker": "AAPL", "prices": list(range(50))}
+
+    @test_app.post("/stocks/AAPL")
+    async def _stocks_post():
+        return {"ok": True}
+
+    @test_app.get("/transactions/AAPL")
+    async def _transactions(response: Response):
+        response.headers["Cache-Control"] = "public, max-age=60"
+        return [{"ticker": "AAPL"}]
+
+    @test_app.get("/other")
+    async def _other():
+        return {"ok": True}
+
+    test_app.add_middleware(app_module.ResponseHeadersMiddleware)
+    return TestClient(test_app)
+
+
+def test_etag_added_and_conditional_get_returns_304():
+    client = _build_client()
+
+    first = client.get("/stocks/AAPL")
+    etag = first.headers["etag"]
+    assert first.status_code == 200
+    assert etag.startswith('"') and etag.endswith('"')
+    assert first.headers["cache-control"] == "private, max-age=0, must-revalidate"
+
+    second = client.get("/stocks/AAPL", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+
+    weak = client.get("/stocks/AAPL", headers={"If-None-Match": f'"stale", W/{etag}'})
+    assert weak.status_code == 304
+
+
+def test_etag_mismatch_returns_full_body():
+    client = _build_client()
+
+    response = client.get("/stocks/AAPL", headers={"If-None-Match": '"stale"'})
+
+    assert response.status_code == 200
+    assert response.json()["ticker"] == "AAPL"
+
+
+def test_etag_keeps_router_cache_control_and_skips_other_requests():
+    client = _build_client()
+
+    transactions = client.get("/transactions/AAPL")
+    assert transactions.headers["cache-control"] == "public, max-age=60"
+    assert "etag" in transactions.headers
+
+    assert "etag" not in client.post("/stocks/AAPL").headers
+    assert "etag" not in client.get("/other").headers
+
+
+def test_security_and_no_cache_headers_applied_in_same_layer():
+    client = _build_client()
+
+    post = client.post("/stocks/AAPL")
+    assert post.headers["cache-control"] == "no-store, no-cache, must-revalidate"
+    assert post.headers["pragma"] == "no-cache"
+    assert post.headers["x-frame-options"] == "DENY"
+
+    other = client.get("/other")
+    assert "cache-control" not in other.headers
+    assert other.headers["x-content-type-options"] == "nosniff"
+
+    not_modified = client.get("/stocks/AAPL", headers={"If-None-Match": "*"})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["x-frame-options"] == "DENY"
+
+
+def test_profiling_middleware_returns_html_report_only_when_requested(monkeypatch):
+    pytest.importorskip("pyinstrument")
+    monkeypatch.setattr(app_module, "ADMIN_API_KEY", "")
+    test_app = FastAPI()
+
+    @test_app.get("/other")
+    async def _other():
+        return {"ok": True}
+
+    test_app.add_middleware(app_module.ProfilingMiddleware)
+    client = TestClient(test_app)
+
+    assert client.get("/other").json() == {"ok": True}
+    assert client.get("/other?profile=0").json() == {"ok": True}
+
+    profiled = client.get("/other?profile=1")
+    assert profiled.status_code == 200
+    assert profiled.headers["content-type"].startswith("text/html")
+
+
+def test_health_shortcut_answers_before_inner_stack():
+    calls = {"count": 0}
+
+    async def _inner(scope, receive, send):
+        calls["count"] += 1
+        await FastAPI()(scope, receive, send)
+
+    client = TestClient(app_module.HealthShortcutMiddleware(_inner))
+
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+    assert response.headers["content-length"] == "15"
+    assert calls["count"] == 0
+
+    assert client.get("/health/ready").status_code == 404
+    assert calls["count"] == 1
+
+
+def test_token_bucket_rejections_carry_security_headers_once():
+    stack = app_module.app.build_middleware_stack()
+    guard = stack
+    while not isinstance(guard, app_module.TokenBucketMiddleware):
+        guard = guard.app
+    guard.capacity, guard.rate = 1.0, 0.001
+    client = TestClient(stack)
+
+    client.get("/other")
+    for _ in range(2):
+        rejected = client.get("/other")
+        assert rejected.status_code == 429
+        assert rejected.headers.get_list("x-frame-options") == ["DENY"]
+        assert rejected.headers.get_list("retry-after") == ["1"]
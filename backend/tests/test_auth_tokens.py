@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret-key")
+
+from services import auth_services
+
+
+def test_decode_access_token_caches_verified_payload_by_digest(monkeypatch):
+    monkeypatch.setattr(auth_services, "_access_token_cache", {})
+    token = auth_services.create_access_token({"sub": "u@example.com"})
+    calls = {"count": 0}
+    real_decode = auth_services.decode_jwt_token
+
+    def _counting_decode(value):
+        calls["count"] += 1
+        return real_decode(value)
+
+    monkeypatch.setattr(auth_services, "decode_jwt_token", _counting_decode)
+
+    first = auth_services.decode_access_token(token)
+    first["sub"] = "mutated"
+    second = auth_services.decode_access_token(token)
+
+    assert calls["count"] == 1
+    assert second["sub"] == "u@example.com"
+    assert token.encode() not in repr(auth_services._access_token_cache).encode()
+
+    refresh_token, _jti, _exp = auth_services.create_refresh_token({"sub": "u@example.com"})
+    assert auth_services.decode_access_token(refresh_token) is None
+    assert auth_services.decode_access_token("not-a-token") is None
+    assert len(auth_services._access_token_cache) == 1
+
+
+def test_create_access_token_cached_reuses_signed_token_per_subject(monkeypatch):
+    monkeypatch.setattr(auth_services, "_issued_token_cache", {})
+    now = {"value": 1_000.0}
+    monkeypatch.setattr(auth_services.time, "time", lambda: now["value"])
+
+    first = auth_services.create_access_token_cached("u@example.com")
+    assert auth_services.create_access_token_cached("u@example.com") is first
+    assert auth_services.create_access_token_cached("v@example.com") is not first
+
+    now["value"] += auth_services.ISSUED_TOKEN_CACHE_TTL_SECONDS
+    assert auth_services.create_access_token_cached("u@example.com") is not first
+
+
+def test_password_verification_cache_is_keyed_on_stored_hash(monkeypatch):
+    monkeypatch.setattr(auth_services, "_verified_password_cache", {})
+    monkeypatch.setattr(auth_services, "AUTH_VERIFY_CACHE_TTL", 60)
+
+    assert not auth_services.is_password_verification_cached("u@example.com", "pw", "hash-1")
+    auth_services.remember_password_verification("u@example.com", "pw", "hash-1")
+
+    assert auth_services.is_password_verification_cached("u@example.com", "pw", "hash-1")
+    assert not auth_services.is_password_verification_cached("u@example.com", "other", "hash-1")
+    assert not auth_services.is_password_verification_cached("u@example.com", "pw", "hash-2")
+
+    monkeypatch.setattr(auth_services, "AUTH_VERIFY_CACHE_TTL", 0)
+    assert not auth_services.is_password_verification_cached("u@example.com", "pw", "hash-1")
+
+
+def test_refresh_token_id_hash_is_tagged_keyed_blake2b_and_accepts_legacy_sha256():
+    import hashlib
+
+    current = auth_services.hash_refresh_token_id("jti-1")
+    accepted = auth_services.refresh_token_id_hashes("jti-1")
+
+    assert current.startswith("b2$") and current != auth_services.hash_refresh_token_id("jti-2")
+    assert accepted == [current, hashlib.sha256(b"jti-1").hexdigest()]
+
+
+def test_create_refresh_token_signs_a_pre_generated_jti():
+    token_id, expire = auth_services.new_refresh_token_id()
+
+    token, returned_id, returned_expire = auth_services.create_refresh_token(
+        {"sub": "u@example.com"}, token_id=token_id, expire=expire
+    )
+
+    payload = auth_services.decode_refresh_token(token)
+    assert (returned_id, returned_expire) == (token_id, expire)
+    assert payload["jti"] == token_id
+    assert payload["exp"] == int(expire.timestamp())
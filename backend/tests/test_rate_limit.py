@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from utils import limiter as limiter_module
+
+
+def _build_guard(capacity: int, rate: float) -> limiter_module.TokenBucketMiddleware:
+    test_app = FastAPI()
+
+    @test_app.get("/ping")
+    async def _ping():
+        return {"ok": True}
+
+    return limiter_module.TokenBucketMiddleware(test_app, capacity=capacity, rate=rate)
+
+
+def test_token_bucket_rejects_after_burst_and_refills(monkeypatch):
+    clock = {"now": 100.0}
+    monkeypatch.setattr(limiter_module.time, "monotonic", lambda: clock["now"])
+    client = TestClient(_build_guard(capacity=2, rate=1.0))
+
+    assert client.get("/ping").status_code == 200
+    assert client.get("/ping").status_code == 200
+
+    rejected = client.get("/ping")
+    assert rejected.status_code == 429
+    assert rejected.json() == {"error": "Rate limit exceeded"}
+    assert rejected.headers["retry-after"] == "1"
+
+    clock["now"] += 1.0
+    assert client.get("/ping").status_code == 200
+
+
+def test_token_bucket_sweeps_idle_buckets(monkeypatch):
+    clock = {"now": 0.0}
+    monkeypatch.setattr(limiter_module.time, "monotonic", lambda: clock["now"])
+    monkeypatch.setattr(limiter_module, "_MAX_BUCKETS", 2)
+    guard = _build_guard(capacity=2, rate=1.0)
+    guard._buckets.update({"10.0.0.1": (0.0, 0.0), "10.0.0.2": (1.0, 0.0)})
+
+    clock["now"] = 5.0
+    client = TestClient(guard)
+    assert client.get("/ping").status_code == 200
+
+    assert set(guard._buckets) == {"testclient"}
+
+
+def test_token_bucket_caps_buckets_when_none_are_idle(monkeypatch):
+    clock = {"now": 0.0}
+    monkeypatch.setattr(limiter_module.time, "monotonic", lambda: clock["now"])
+    monkeypatch.setattr(limiter_module, "_MAX_BUCKETS", 2)
+    guard = _build_guard(capacity=2, rate=1.0)
+    guard._buckets.update({"10.0.0.1": (1.0, 0.0), "10.0.0.2": (1.0, 0.0)})
+
+    client = TestClient(guard)
+    assert client.get("/ping").status_code == 200
+
+    assert list(guard._buckets) == ["10.0.0.2", "testclient"]
+
+
+def test_token_bucket_keys_on_trusted_client_ip_header(monkeypatch):
+    monkeypatch.setattr(limiter_module, "RATE_LIMIT_CLIENT_IP_HEADER", b"do-connecting-ip")
+    guard = _build_guard(capacity=1, rate=0.001)
+    client = TestClient(guard)
+
+    assert client.get("/ping", headers={"do-connecting-ip": "198.51.100.1"}).status_code == 200
+    assert client.get("/ping", headers={"do-connecting-ip": "198.51.100.2"}).status_code == 200
+    assert client.get("/ping", headers={"do-connecting-ip": "198.51.100.1"}).status_code == 429
+    assert set(guard._buckets) == {"198.51.100.1", "198.51.100.2"}
+
+
+def test_client_ip_takes_last_forwarded_hop_and_ignores_header_when_untrusted(monkeypatch):
+    scope = {"client": ("10.0.0.9", 1234), "headers": [(b"x-forwarded-for", b"6.6.6.6, 203.0.113.7")]}
+
+    assert limiter_module.client_ip(scope) == "10.0.0.9"
+    monkeypatch.setattr(limiter_module, "RATE_LIMIT_CLIENT_IP_HEADER", b"x-forwarded-for")
+    assert limiter_module.client_ip(scope) == "203.0.113.7"
+
+
+def test_async_token_bucket_only_waits_once_burst_is_spent(monkeypatch):
+    clock = {"now": 50.0}
+    sleeps: list[float] = []
+
+    async def _fake_sleep(delay):
+        sleeps.append(delay)
+        clock["now"] += delay
+
+    monkeypatch.setattr(limiter_module.time, "monotonic", lambda: clock["now"])
+    monkeypatch.setattr(limiter_module.asyncio, "sleep", _fake_sleep)
+    pacer = limiter_module.AsyncTokenBucket(rate=2.0, capacity=2)
+
+    async def _run():
+        for _ in range(4):
+            await pacer.acquire()
+
+    asyncio.run(_run())
+
+    assert sleeps == [0.5, 0.5]
+
+
+def test_route_limiter_uses_sliding_window_counter_by_default():
+    from limits.strategies import SlidingWindowCounterRateLimiter
+
+    assert limiter_module.RATE_LIMIT_STRATEGY == "sliding-window-counter"
+    assert isinstance(limiter_module.limiter._limiter, SlidingWindowCounterRateLimiter)
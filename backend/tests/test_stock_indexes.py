@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import types
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret-key")
+
+
+class _NoopDB:
+    def __getitem__(self, _name: str):
+        return None
+
+
+if "database.database" not in sys.modules:
+    fake_db_module = types.ModuleType("database.database")
+    fake_db_module.user_db = _NoopDB()
+    fake_db_module.stock_db = _NoopDB()
+    fake_db_module.sec_db = _NoopDB()
+    sys.modules["database.database"] = fake_db_module
+
+_db_module = sys.modules["database.database"]
+for _name in ("async_user_db", "async_stock_db", "async_sec_db"):
+    if not hasattr(_db_module, _name):
+        setattr(_db_module, _name, _NoopDB())
+
+from services import stock_service
+
+
+class _AsyncCollection:
+    def __init__(self, doc=None):
+        self.doc = doc
+        self.indexes: list[str] = []
+        self.updates: list[dict] = []
+
+    async def create_index(self, keys, **kwargs):
+        self.indexes.append(kwargs.get("name") or str(keys))
+
+    async def find_one(self, *_args, **_kwargs):
+        return self.doc
+
+    async def update_one(self, _filter, update, upsert=False):
+        self.updates.append(update)
+
+
+class _AsyncDB:
+    def __init__(self, names, meta_doc=None):
+        self._names = names
+        self.collections = {"meta": _AsyncCollection(meta_doc)}
+
+    async def list_collection_names(self):
+        return list(self._names)
+
+    def __getitem__(self, name: str):
+        return self.collections.setdefault(name, _AsyncCollection())
+
+
+def _patch_dbs(monkeypatch, meta_doc=None):
+    stock = _AsyncDB(["stock_data_AAPL", "meta"], meta_doc)
+    sec = _AsyncDB(["form_4_links_AAPL"])
+    users = _AsyncDB(["users"])
+    monkeypatch.setattr(stock_service, "async_stock_db", stock)
+    monkeypatch.setattr(stock_service, "async_sec_db", sec)
+    monkeypatch.setattr(stock_service, "async_user_db", users)
+    return stock, sec, users
+
+
+def _recorded(*extra):
+    return {
+        "_id": "schema",
+        "idx_version": stock_service.CURRENT_IDX_VERSION,
+        "indexed": ["form_4_links_AAPL", "stock_data_AAPL", "users.idx_email_ci", "users.idx_email_unique", *extra],
+    }
+
+
+def test_ensure_indexes_records_version_after_creating(monkeypatch):
+    stock, sec, users = _patch_dbs(monkeypatch)
+
+    asyncio.run(stock_service.ensure_indexes())
+
+    assert stock["stock_data_AAPL"].indexes
+    assert sec["form_4_links_AAPL"].indexes == ["idx_txn_date_desc"]
+    assert users["users"].indexes == ["idx_email_unique", "idx_email_ci"]
+    update = stock["meta"].updates[0]["$set"]
+    assert update["idx_version"] == stock_service.CURRENT_IDX_VERSION
+    assert update["indexed"] == _recorded()["indexed"]
+
+
+def test_ensure_indexes_skips_when_everything_recorded(monkeypatch):
+    stock, sec, users = _patch_dbs(monkeypatch, meta_doc=_recorded())
+
+    asyncio.run(stock_service.ensure_indexes())
+
+    assert stock["stock_data_AAPL"].indexes == []
+    assert sec["form_4_links_AAPL"].indexes == []
+    assert users["users"].indexes == []
+    assert stock["meta"].updates == []
+
+
+def test_ensure_indexes_indexes_collections_added_after_version_recorded(monkeypatch):
+    stock, sec, users = _patch_dbs(monkeypatch, meta_doc=_recorded())
+    sec._names.append("form_4_links_MSFT")
+
+    asyncio.run(stock_service.ensure_indexes())
+
+    assert sec["form_4_links_MSFT"].indexes == ["idx_txn_date_desc"]
+    assert sec["form_4_links_AAPL"].indexes == []
+    assert users["users"].indexes == []
+    assert "form_4_links_MSFT" in stock["meta"].updates[0]["$set"]["indexed"]
+
+
+def test_case_duplicate_emails_are_logged_and_other_indexes_recorded(monkeypatch, caplog):
+    from pymongo.errors import OperationFailure
+
+    stock, sec, users = _patch_dbs(monkeypatch)
+    collection = users["users"]
+
+    async def _create_index(keys, **kwargs):
+        if kwargs.get("name") == "idx_email_ci":
+            raise OperationFailure("E11000 duplicate key error", code=11000)
+        collection.indexes.append(kwargs.get("name"))
+
+    class _Cursor:
+        async def to_list(self):
+            return [{"_id": "foo@x.com", "count": 2}]
+
+    async def _aggregate(_pipeline):
+        return _Cursor()
+
+    collection.create_index = _create_index
+    collection.aggregate = _aggregate
+
+    asyncio.run(stock_service.ensure_indexes())
+
+    indexed = stock["meta"].updates[0]["$set"]["indexed"]
+    assert "users.idx_email_unique" in indexed
+    assert "users.idx_email_ci" not in indexed
+    assert "foo@x.com" in caplog.text
@@ -1,4 +1,141 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+
 from slowapi import Limiter
-from slowapi.util import get_remote_address
+from starlette.requests import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Sliding-window counters weight the previous window's hits, so a client can't
+# spend two full windows' quota around a fixed-window boundary. Setting
+# RATE_LIMIT_STORAGE_URI (e.g. redis://host:6379) shares counters across workers.
+_RATE_LIMIT_STRATEGIES = {"sliding-window-counter", "fixed-window", "moving-window"}
+RATE_LIMIT_STRATEGY = os.getenv("RATE_LIMIT_STRATEGY", "sliding-window-counter").strip().lower()
+if RATE_LIMIT_STRATEGY not in _RATE_LIMIT_STRATEGIES:
+    RATE_LIMIT_STRATEGY = "sliding-window-counter"
+RATE_LIMIT_STORAGE_URI = os.getenv("RATE_LIMIT_STORAGE_URI", "memory://").strip() or "memory://"
+
+# Behind a load balancer scope["client"] is the proxy, so every user would share
+# one key. RATE_LIMIT_CLIENT_IP_HEADER names the header the proxy sets to the real
+# client address (DigitalOcean App Platform: do-connecting-ip). Only set it when
+# all traffic arrives through that proxy, otherwise clients can pick their own key.
+RATE_LIMIT_CLIENT_IP_HEADER = os.getenv("RATE_LIMIT_CLIENT_IP_HEADER", "").strip().lower().encode("latin-1")
+
+
+def client_ip(scope: Scope) -> str:
+    """Rate-limit key for a request: the trusted forwarded address, else the peer."""
+    if RATE_LIMIT_CLIENT_IP_HEADER:
+        for name, value in scope.get("headers", ()):
+            if name == RATE_LIMIT_CLIENT_IP_HEADER:
+                # For X-Forwarded-For style lists, the trusted proxy appended the last hop.
+                ip = value.decode("latin-1").rsplit(",", 1)[-1].strip()
+                if ip:
+                    return ip
+                break
+    client = scope.get("client")
+    return client[0] if client else "127.0.0.1"
+
+
+def _request_client_ip(request: Request) -> str:
+    return client_ip(request.scope)
+
+
+# Per-route limits (@limiter.limit) are enforced by the decorators themselves;
+# no default_limits are configured, so SlowAPI's middleware is not installed.
+limiter = Limiter(
+    key_func=_request_client_ip,
+    strategy=RATE_LIMIT_STRATEGY,
+    storage_uri=RATE_LIMIT_STORAGE_URI,
+)
+
+try:
+    RATE_LIMIT_BURST = max(1, int(os.getenv("RATE_LIMIT_BURST", "120").strip() or "120"))
+except ValueError:
+    RATE_LIMIT_BURST = 120
+
+try:
+    RATE_LIMIT_PER_SECOND = max(0.1, float(os.getenv("RATE_LIMIT_PER_SECOND", "5").strip() or "5"))
+except ValueError:
+    RATE_LIMIT_PER_SECOND = 5.0
+
+_MAX_BUCKETS = 10_000
+
+
+class TokenBucketMiddleware:
+    """
+    Coarse per-client-IP flood guard in front of the app, keyed by client_ip().
+
+    Each IP holds (tokens, last_refill) in an OrderedDict kept in last-seen order.
+    All updates happen on the event loop with no await in between, so no lock is
+    needed. Past _MAX_BUCKETS, eviction pops from the least-recently-seen end:
+    buckets idle long enough to have refilled completely, then -- if a wide-source
+    flood leaves none idle -- the oldest ones, so each request evicts in amortised
+    O(1) and the dict never grows past the cap.
+    """
+
+    _REJECT_HEADERS = (
+        (b"content-type", b"application/json"),
+        (b"content-length", b"31"),
+        (b"retry-after", b"1"),
+    )
+    _REJECT_BODY = {"type": "http.response.body", "body": b'{"error":"Rate limit exceeded"}'}
+
+    def __init__(self, app: ASGIApp, capacity: int = RATE_LIMIT_BURST, rate: float = RATE_LIMIT_PER_SECOND) -> None:
+        self.app = app
+        self.capacity = float(capacity)
+        self.rate = rate
+        self._full_after = self.capacity / rate
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def _evict(self, now: float) -> None:
+        buckets = self._buckets
+        while buckets:
+            _tokens, ts = buckets[next(iter(buckets))]
+            if len(buckets) <= _MAX_BUCKETS and now - ts < self._full_after:
+                break
+            buckets.popitem(last=False)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        ip = client_ip(scope)
+        now = time.monotonic()
+        tokens, ts = self._buckets.get(ip, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - ts) * self.rate)
+        allowed = tokens >= 1
+        self._buckets[ip] = (tokens - 1 if allowed else tokens, now)
+        self._buckets.move_to_end(ip)
+        if len(self._buckets) > _MAX_BUCKETS:
+            self._evict(now)
+        if not allowed:
+            # Fresh message each time: outer middleware extends its header list in place.
+            await send({"type": "http.response.start", "status": 429, "headers": list(self._REJECT_HEADERS)})
+            await send(self._REJECT_BODY)
+            return
+        await self.app(scope, receive, send)
+
+
+class AsyncTokenBucket:
+    """
+    Start-rate pacer for outbound batch work (e.g. per-ticker scraper calls).
+
+    acquire() reserves a token immediately and sleeps only if the bucket went
+    negative, so callers wait just long enough to stay under `rate` per second
+    instead of pausing a fixed interval after every call.
+    """
+
+    def __init__(self, rate: float, capacity: int = 1) -> None:
+        self.rate = rate
+        self.capacity = float(capacity)
+        self._tokens = self.capacity
+        self._ts = time.monotonic()
 
-limiter = Limiter(key_func=get_remote_address)
+    async def acquire(self) -> None:
+        now = time.monotonic()
+        tokens = min(self.capacity, self._tokens + (now - self._ts) * self.rate) - 1
+        self._tokens, self._ts = tokens, now
+        if tokens < 0:
+            await asyncio.sleep(-tokens / self.rate)